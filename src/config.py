@@ -1,9 +1,32 @@
+import functools
+import os
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 
-from constants import config
+from constants import VALID_AGENTS, VALID_AGENTS_STR, config
 from file_ops import FileOperations
 from log import logger
 
+# Normalized config settings keyed by (resolved path, st_mtime_ns, st_size)
+_CONFIG_CACHE: OrderedDict[
+    tuple[str, int, int], tuple[Mapping[str, str], bool, str]
+] = OrderedDict()
+
+
+@dataclass(frozen=True)
+class ResolvedMapping:
+    """Target->source mapping with absolute paths computed once"""
+
+    target: str
+    source: str
+    target_path: Path
+    source_path: Path
+    target_str: str
+    source_str: str
+
 
 class ConfigValidator:
     @staticmethod
@@ -11,32 +34,41 @@ class ConfigValidator:
         if not isinstance(agents, list):
             raise ValueError(f"'agents' must be a list, got {type(agents)}")
 
-        validated_agents = []
         for agent in agents:
             if not isinstance(agent, str):
                 raise ValueError(
                     f"Agent name must be string, got {type(agent)}: {agent}"
                 )
 
-            agent_lower = agent.lower()
-            if agent_lower not in config.AGENT_DEFAULTS:
-                available = ", ".join(sorted(config.AGENT_DEFAULTS.keys()))
-                raise ValueError(
-                    f"Unknown agent '{agent}'. Available: {available}"
-                )
-
-            validated_agents.append(agent_lower)
+        validated_agents = [agent.lower() for agent in agents]
+        if not VALID_AGENTS.issuperset(validated_agents):
+            unknown = next(
+                agent
+                for agent, agent_lower in zip(agents, validated_agents)
+                if agent_lower not in VALID_AGENTS
+            )
+            raise ValueError(
+                f"Unknown agent '{unknown}'. Available: {VALID_AGENTS_STR}"
+            )
 
         return validated_agents
 
     @staticmethod
-    def create_mappings(agents: list[str], truth_file: str) -> dict[str, str]:
+    def create_mappings(
+        agents: Sequence[str], truth_file: str
+    ) -> Mapping[str, str]:
         """Create target->source mappings from agent list"""
-        mappings = {}
-        for agent in agents:
-            target_path = config.AGENT_DEFAULTS[agent]
-            mappings[target_path] = truth_file
-        return mappings
+        return ConfigValidator._create_mappings(tuple(agents), truth_file)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=config.MAPPINGS_CACHE_SIZE)
+    def _create_mappings(
+        agents: tuple[str, ...], truth_file: str
+    ) -> Mapping[str, str]:
+        """Build read-only mappings once per agents/truth file pair"""
+        return MappingProxyType(
+            {config.AGENT_DEFAULTS[agent]: truth_file for agent in agents}
+        )
 
 
 class MemoryProxyConfig:
@@ -45,15 +77,50 @@ class MemoryProxyConfig:
     def __init__(self, config_path: Path):
         self.config_path = config_path
         self.directory = config_path.parent
-        self.mappings: dict[str, str] = {}
+        self.mappings: Mapping[str, str] = {}
         self.recursive: bool = True
         self.respect_gitignore: bool = True
         self.truth_memory_file: str = "AGENT.md"
         self._load_and_validate_config()
+        self.resolved_mappings = self._resolve_mappings()
+
+    def _resolve_mappings(self) -> tuple[ResolvedMapping, ...]:
+        """Precompute absolute source and target paths for all mappings"""
+        resolved = []
+        for target, source in self.mappings.items():
+            target_path = self.directory / target
+            source_path = self.directory / source
+            resolved.append(
+                ResolvedMapping(
+                    target=target,
+                    source=source,
+                    target_path=target_path,
+                    source_path=source_path,
+                    target_str=os.fspath(target_path),
+                    source_str=os.fspath(source_path),
+                )
+            )
+        return tuple(resolved)
 
     def _load_and_validate_config(self) -> None:
         """Load and validate YAML configuration"""
         try:
+            stat = self.config_path.stat()
+            cache_key = (
+                str(self.config_path.resolve()),
+                stat.st_mtime_ns,
+                stat.st_size,
+            )
+            cached = _CONFIG_CACHE.get(cache_key)
+            if cached is not None:
+                _CONFIG_CACHE.move_to_end(cache_key)
+                mappings, self.respect_gitignore, self.truth_memory_file = (
+                    cached
+                )
+                self.mappings = mappings
+                logger.debug(f"Using cached config for {self.config_path}")
+                return
+
             config_data = FileOperations.load_yaml_config(self.config_path)
 
             if "agents" not in config_data:
@@ -75,6 +142,14 @@ class MemoryProxyConfig:
                 agents, self.truth_memory_file
             )
 
+            _CONFIG_CACHE[cache_key] = (
+                self.mappings,
+                self.respect_gitignore,
+                self.truth_memory_file,
+            )
+            if len(_CONFIG_CACHE) > config.CONFIG_CACHE_SIZE:
+                _CONFIG_CACHE.popitem(last=False)
+
             logger.info(
                 f"Loaded config from {self.config_path} with {len(agents)} agents "
                 f"(truth_file={self.truth_memory_file}, respect_gitignore={self.respect_gitignore})"
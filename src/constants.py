@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from pathlib import Path
 
 
 @dataclass
@@ -7,6 +8,11 @@ class Config:
     ENV_VAR: str = "AGENT_MEMORY_PATHS"
     DEFAULT_ENCODING: str = "utf-8"
     DEBOUNCE_DELAY: float = 0.05  # 50ms debounce
+    MAX_DEBOUNCE_DELAY: float = 0.5  # flush bursts at least every 500ms
+    CONFIG_CACHE_SIZE: int = 128  # parsed .amp.yaml files kept in memory
+    IGNORE_CACHE_SIZE: int = 16384  # memoized gitignore match results
+    SPEC_CACHE_SIZE: int = 128  # compiled .gitignore pattern sets
+    MAPPINGS_CACHE_SIZE: int = 32  # agent list -> mappings results
 
     AGENT_DEFAULTS: dict[str, str] = field(
         default_factory=lambda: {
@@ -17,5 +23,21 @@ class Config:
         }
     )
 
+    # Parsed gitignore rules are kept here between runs
+    CACHE_DIR: Path = field(
+        default_factory=lambda: Path.home() / ".cache" / "agent-memory-proxy"
+    )
+
+    # Directories never searched for configs, gitignore rules or memory
+    # files, gitignore or not
+    ALWAYS_IGNORED_DIRS: frozenset[str] = field(
+        default_factory=lambda: frozenset(
+            {".git", "node_modules", "__pycache__", ".venv"}
+        )
+    )
+
 
 config = Config()
+
+VALID_AGENTS = frozenset(config.AGENT_DEFAULTS)
+VALID_AGENTS_STR = ", ".join(sorted(config.AGENT_DEFAULTS))
@@ -2,9 +2,15 @@
 File operations, path utilities, and gitignore management
 """
 
+import functools
+import hashlib
 import os
+import pickle
+import re
+import shutil
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import pathspec
 import yaml
@@ -12,6 +18,11 @@ import yaml
 from constants import config
 from log import logger
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
 
 class FileOperations:
     """Utility class for file operations with consistent error handling"""
@@ -41,12 +52,42 @@ class FileOperations:
             logger.error(f"Failed to write file {path}: {e}")
             raise
 
+    @staticmethod
+    def copy_file(
+        source: Path,
+        target: Path,
+        source_stat: Optional[os.stat_result] = None,
+    ) -> None:
+        """Copy file bytes and modification time without decoding"""
+        try:
+            if source_stat is None:
+                source_stat = source.stat()
+
+            try:
+                shutil.copyfile(source, target)
+            except FileNotFoundError:
+                if target.parent.exists():
+                    raise
+                # Create target directory only when it is actually missing
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source, target)
+
+            os.utime(
+                target, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns)
+            )
+        except FileNotFoundError:
+            # A vanished source is the caller's to report
+            raise
+        except Exception as e:
+            logger.error(f"Failed to copy file {source} to {target}: {e}")
+            raise
+
     @staticmethod
     def load_yaml_config(path: Path) -> dict:
         """Load YAML configuration file"""
         try:
             content = FileOperations.read_file(path)
-            config = yaml.safe_load(content)
+            config = yaml.load(content, Loader=_Loader)
             if not config:
                 raise ValueError(f"Empty or invalid YAML in {path}")
             return config
@@ -89,79 +130,399 @@ class PathUtils:
                 logger.warning(f"Ignoring invalid path: {path_str}")
         return paths
 
+    @staticmethod
+    def iter_tree(
+        root: Path,
+        gitignore_manager: Optional["GitignoreManager"] = None,
+        pruned_names: frozenset[str] = frozenset(),
+    ) -> Iterator[tuple[str, list[str], list[str]]]:
+        """Walk a tree top-down with os.scandir, like os.walk
+
+        Directories in ``pruned_names`` or ignored by ``gitignore_manager``
+        are never entered. Callers may clear the yielded dirnames list to
+        skip a subtree.
+        """
+        stack = [os.fspath(root)]
+        while stack:
+            dirpath = stack.pop()
+            dirnames: list[str] = []
+            filenames: list[str] = []
+
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        if not entry.is_dir(follow_symlinks=False):
+                            filenames.append(entry.name)
+                        elif entry.name not in pruned_names:
+                            dirnames.append(entry.name)
+            except OSError as e:
+                logger.debug(f"Error scanning {dirpath}: {e}")
+                continue
+
+            yield dirpath, dirnames, filenames
+
+            # Gitignore checks run only for subtrees the caller kept
+            stack.extend(
+                os.path.join(dirpath, name)
+                for name in reversed(dirnames)
+                if gitignore_manager is None
+                or not gitignore_manager.is_ignored_name(
+                    dirpath, name, is_dir=True
+                )
+            )
+
 
 class GitignoreManager:
     """Manages gitignore rules for filtering directories and files"""
 
-    def __init__(self, root_path: Path):
-        self.root_path = root_path.resolve()
+    def __init__(self, root_path: Path, cache_dir: Optional[Path] = None):
+        # Kept as given so paths built from it match without resolve()
+        self.root_path = Path(os.path.abspath(root_path))
+        self._root_prefix = os.path.join(os.fspath(self.root_path), "")
+        # Paths may also arrive through the root's resolved location
+        self._real_prefix = os.path.join(os.path.realpath(self.root_path), "")
+        # Optional on-disk copy of the parsed rules, one file per root
+        self._cache_file: Optional[Path] = None
+        if cache_dir is not None:
+            digest = hashlib.sha256(os.fsencode(self.root_path)).hexdigest()[
+                :16
+            ]
+            self._cache_file = cache_dir / f"gitignore-{digest}.pickle"
+        # mtime_ns of every walked directory and .gitignore file, used to
+        # validate the on-disk copy
+        self._stamps: dict[str, int] = {}
         self.spec_cache: dict[Path, Optional[pathspec.PathSpec]] = {}
+        # Root-relative patterns of every .gitignore, keyed by its directory
+        self._own_patterns: dict[Path, list[str]] = {}
+        # Bounded is_ignored() results keyed by the path string as given
+        self._match_cached = functools.lru_cache(
+            maxsize=config.IGNORE_CACHE_SIZE
+        )(self._match)
+        self._has_any = False
+        if not self._load_cache():
+            self._collect_gitignore_patterns()
+
+    def reload_gitignore(self, gitignore_path: str) -> bool:
+        """Re-collect rules below one changed .gitignore
+
+        Returns False when the file cannot affect any rules: outside root,
+        or inside a directory the startup walk does not enter.
+        """
+        canonical = self._under_root(gitignore_path)
+        if canonical is None:
+            return False
+        dirpath = os.path.dirname(canonical)
+        rel_dir = self._rel_posix(canonical).rpartition("/")[0]
+
+        parent_rel = ""
+        for name in rel_dir.split("/") if rel_dir else ():
+            if name in config.ALWAYS_IGNORED_DIRS or self.is_ignored_dir_name(
+                parent_rel, name
+            ):
+                return False
+            parent_rel = f"{parent_rel}/{name}" if parent_rel else name
+
+        # A changed rule can un-ignore directories whose own .gitignore
+        # was never read, so the whole subtree is collected again
+        self._forget_subtree(dirpath)
+        self._collect_gitignore_patterns(dirpath)
+        self._match_cached.cache_clear()
+        return True
+
+    def _forget_subtree(self, dirpath: str) -> None:
+        """Drop rules, specs and stamps at and below a directory"""
+        prefix = os.path.join(dirpath, "")
+
+        def kept(key: Union[Path, str]) -> bool:
+            key_str = os.fspath(key)
+            return key_str != dirpath and not key_str.startswith(prefix)
+
+        self._own_patterns = {
+            key: value
+            for key, value in self._own_patterns.items()
+            if kept(key)
+        }
+        self.spec_cache = {
+            key: value for key, value in self.spec_cache.items() if kept(key)
+        }
+        self._stamps = {
+            key: value for key, value in self._stamps.items() if kept(key)
+        }
+
+    def _load_cache(self) -> bool:
+        """Restore rules saved by an earlier run and re-read what changed"""
+        if self._cache_file is None:
+            return False
 
-    def _find_gitignore_files(self, directory: Path) -> list[Path]:
-        """Find all .gitignore files from directory up to root"""
-        gitignore_files = []
-        current = directory.resolve()
+        try:
+            with open(self._cache_file, "rb") as f:
+                version, stamps, own_patterns = pickle.load(f)
+        except Exception as e:
+            logger.debug(f"Gitignore cache {self._cache_file} not used: {e}")
+            return False
+        if version != pathspec.__version__:
+            return False
 
-        while (
-            current.is_relative_to(self.root_path) or current == self.root_path
-        ):
-            gitignore_path = current / ".gitignore"
-            if gitignore_path.exists():
-                gitignore_files.append(gitignore_path)
+        self._stamps = stamps
+        self._own_patterns = own_patterns
+        self._has_any = any(own_patterns.values())
+        self._refresh_changed()
+        return True
+
+    def _refresh_changed(self) -> None:
+        """Re-read only the directories whose mtime moved since the save"""
+        # An edited .gitignore changes its own mtime; a new or removed
+        # entry changes its directory's
+        changed_rules: set[str] = set()
+        changed_listings: set[str] = set()
+        for path_str, mtime_ns in self._stamps.items():
+            try:
+                if os.stat(path_str).st_mtime_ns == mtime_ns:
+                    continue
+            except OSError:
+                pass
+            dirpath, name = os.path.split(path_str)
+            if name == ".gitignore":
+                changed_rules.add(dirpath)
+            else:
+                changed_listings.add(path_str)
+
+        # Sorted so a directory comes before everything below it
+        collected: list[str] = []
+        for dirpath in sorted(changed_rules | changed_listings):
+            if any(
+                dirpath == top or dirpath.startswith(os.path.join(top, ""))
+                for top in collected
+            ):
+                continue
+            gitignore_path = os.path.join(dirpath, ".gitignore")
+            if (
+                dirpath in changed_rules
+                or not os.path.isdir(dirpath)
+                or os.path.isfile(gitignore_path)
+                != (gitignore_path in self._stamps)
+            ):
+                self._forget_subtree(dirpath)
+                self._collect_gitignore_patterns(dirpath)
+                collected.append(dirpath)
+            else:
+                self._collect_new_subdirs(dirpath)
 
-            if current == self.root_path:
-                break
-            current = current.parent
+        self._has_any = any(self._own_patterns.values())
 
-        return list(reversed(gitignore_files))
+    def _collect_new_subdirs(self, dirpath: str) -> None:
+        """Walk subdirectories added to a directory whose rules are known"""
+        try:
+            with os.scandir(dirpath) as entries:
+                names = [
+                    entry.name
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False)
+                ]
+        except OSError as e:
+            logger.debug(f"Error listing {dirpath}: {e}")
+            return
+
+        rel_dir = self._rel_posix(dirpath)
+        for name in names:
+            subdir = os.path.join(dirpath, name)
+            if not (
+                subdir in self._stamps
+                or name in config.ALWAYS_IGNORED_DIRS
+                or self.is_ignored_dir_name(rel_dir, name)
+            ):
+                self._collect_gitignore_patterns(subdir)
+        self._stamp(
+            dirpath, os.path.join(dirpath, ".gitignore") in self._stamps
+        )
+
+    def save_cache(self) -> None:
+        """Write the scoped patterns to disk for the next start"""
+        if self._cache_file is None:
+            return
+
+        tmp_file = self._cache_file.with_suffix(".tmp")
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, "wb") as f:
+                pickle.dump(
+                    (pathspec.__version__, self._stamps, self._own_patterns),
+                    f,
+                    protocol=5,
+                )
+            os.replace(tmp_file, self._cache_file)
+        except Exception as e:
+            logger.debug(f"Error saving gitignore cache {tmp_file}: {e}")
+
+    def _collect_gitignore_patterns(self, top: Optional[str] = None) -> None:
+        """Read all .gitignore files under top, or root, in a single walk"""
+        for root, dirs, files in os.walk(top or self.root_path):
+            directory = Path(root)
+            # os.walk yields absolute paths under root, so slicing the
+            # prefix off is enough to get the relative directory
+            rel_dir = self._rel_posix(root)
+            if ".gitignore" in files:
+                self._own_patterns[directory] = self._read_patterns(
+                    directory, rel_dir
+                )
+            if self._cache_file is not None:
+                self._stamp(root, ".gitignore" in files)
+
+            # Do not descend into directories that are already ignored
+            spec = self._load_gitignore_spec(directory)
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            dirs[:] = [
+                d
+                for d in dirs
+                if d not in config.ALWAYS_IGNORED_DIRS
+                and not (spec and spec.match_file(f"{prefix}{d}/"))
+            ]
+
+        # Trees without any rules skip matching entirely
+        self._has_any = any(self._own_patterns.values())
+
+    def _stamp(self, dirpath: str, has_gitignore: bool) -> None:
+        """Record mtimes that show whether a directory's rules changed"""
+        try:
+            self._stamps[dirpath] = os.stat(dirpath).st_mtime_ns
+            if has_gitignore:
+                gitignore_path = os.path.join(dirpath, ".gitignore")
+                self._stamps[gitignore_path] = os.stat(
+                    gitignore_path
+                ).st_mtime_ns
+        except OSError as e:
+            logger.debug(f"Error reading mtime under {dirpath}: {e}")
+
+    def _rel_posix(self, path_str: str) -> str:
+        """Root-relative posix form of a path string under root"""
+        rel = path_str[len(self._root_prefix) :]
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        return rel
+
+    def _read_patterns(self, directory: Path, rel_dir: str) -> list[str]:
+        """Read a directory's .gitignore as patterns relative to root"""
+        gitignore_path = directory / ".gitignore"
+        try:
+            # Blank and comment lines are dropped before decoding
+            lines = [
+                line.decode(config.DEFAULT_ENCODING)
+                for line in gitignore_path.read_bytes().splitlines()
+                if line.strip() and not line.startswith(b"#")
+            ]
+        except Exception as e:
+            logger.debug(f"Error loading gitignore {gitignore_path}: {e}")
+            return []
+
+        if not rel_dir:
+            return lines
+
+        base = re.sub(r"([\\*?\[])", r"\\\1", rel_dir)
+        return [self._scope_pattern(line, base) for line in lines]
+
+    @staticmethod
+    def _scope_pattern(line: str, base: str) -> str:
+        """Rewrite a nested .gitignore pattern to be relative to root"""
+        negation = "!" if line.startswith("!") else ""
+        pattern = line[len(negation) :]
+
+        if pattern.startswith("/"):
+            # Anchored to the .gitignore directory
+            scoped = f"{base}{pattern}"
+        elif "/" in pattern.rstrip("/"):
+            # A slash in the middle also anchors the pattern
+            scoped = f"{base}/{pattern}"
+        else:
+            # Matches at any depth below the .gitignore directory
+            scoped = f"{base}/**/{pattern}"
+
+        return f"{negation}{scoped}"
+
+    @staticmethod
+    @functools.lru_cache(maxsize=config.SPEC_CACHE_SIZE)
+    def _compile(patterns: tuple[str, ...]) -> pathspec.PathSpec:
+        """Compile patterns once for every manager that reads them"""
+        return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
 
     def _load_gitignore_spec(
         self, directory: Path
     ) -> Optional[pathspec.PathSpec]:
-        """Load and parse gitignore rules for a directory"""
+        """Get gitignore rules that apply within a directory"""
         if directory in self.spec_cache:
             return self.spec_cache[directory]
 
-        try:
-            gitignore_files = self._find_gitignore_files(directory)
-            patterns = []
-
-            for gitignore_file in gitignore_files:
-                with open(
-                    gitignore_file, encoding=config.DEFAULT_ENCODING
-                ) as f:
-                    patterns.extend(f.read().splitlines())
-
-            if patterns:
-                spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
-                self.spec_cache[directory] = spec
-                return spec
-            else:
-                self.spec_cache[directory] = None
-                return None
+        # Reuse the parent's compiled rules and only compile our own
+        parent_spec = None
+        if directory != self.root_path and directory.parent != directory:
+            parent_spec = self._load_gitignore_spec(directory.parent)
 
-        except Exception as e:
-            logger.debug(f"Error loading gitignore for {directory}: {e}")
-            self.spec_cache[directory] = None
-            return None
+        own_patterns = self._own_patterns.get(directory)
+        if own_patterns:
+            own_spec = self._compile(tuple(own_patterns))
+            spec = own_spec if parent_spec is None else parent_spec + own_spec
+        else:
+            spec = parent_spec
+
+        self.spec_cache[directory] = spec
+        return spec
 
-    def is_ignored(self, path: Path) -> bool:
+    def is_ignored(self, path: Path, is_dir: bool = False) -> bool:
         """Check if a path should be ignored based on gitignore rules"""
-        path = path.resolve()
+        # is_dir comes from the caller (walk entry, watchdog event) so
+        # that no stat is needed here
+        if not self._has_any:
+            return False
+        return self._match_cached(os.fspath(path), is_dir)
 
-        # Get relative path from root
-        try:
-            rel_path = path.relative_to(self.root_path)
-        except ValueError:
+    def is_ignored_name(
+        self, dirpath: str, name: str, is_dir: bool = False
+    ) -> bool:
+        """Check an entry given as parent directory string and name"""
+        if not self._has_any:
+            return False
+        return self._match_cached(os.path.join(dirpath, name), is_dir)
+
+    def is_ignored_dir_name(self, parent_rel: str, name: str) -> bool:
+        """Check a directory given by root-relative parent, without stat"""
+        if not self._has_any:
+            return False
+        directory = (
+            self.root_path / parent_rel if parent_rel else self.root_path
+        )
+        spec = self._load_gitignore_spec(directory)
+        if spec is None:
+            return False
+        prefix = f"{parent_rel}/" if parent_rel else ""
+        return spec.match_file(f"{prefix}{name}/")
+
+    def _under_root(self, path_str: str) -> Optional[str]:
+        """Absolute form of path_str spelled with the root prefix, if any"""
+        path_str = os.path.abspath(path_str)
+        if path_str.startswith(self._root_prefix):
+            return path_str
+        if path_str.startswith(self._real_prefix):
+            return self._root_prefix + path_str[len(self._real_prefix) :]
+        return None
+
+    def _match(self, path_str: str, is_dir: bool) -> bool:
+        """Match a path against the gitignore rules of its directory"""
+        canonical = self._under_root(path_str)
+        if canonical is None:
             # Path is outside root, don't ignore
             return False
+        path_str = canonical
+
+        rel_path = self._rel_posix(path_str)
+        if is_dir:
+            # Directory-only rules like "build/" need the trailing slash
+            rel_path += "/"
 
         # Check gitignore rules from the path's directory
-        directory = path.parent if path.is_file() else path
-        spec = self._load_gitignore_spec(directory)
+        directory = path_str if is_dir else os.path.dirname(path_str)
+        spec = self._load_gitignore_spec(Path(directory))
 
         if spec is None:
             return False
 
         # Check if path matches any ignore patterns
-        return spec.match_file(str(rel_path))
+        return spec.match_file(rel_path)
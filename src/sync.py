@@ -2,44 +2,132 @@
 File synchronization, event handling, and debouncing logic
 """
 
+import filecmp
+import logging
 import os
+import threading
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.events import (
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
 
-from config import MemoryProxyConfig
+from config import MemoryProxyConfig, ResolvedMapping
 from constants import config
 from file_ops import FileOperations, GitignoreManager, PathUtils
 from log import logger
 
 
 class SyncDebouncer:
-    """Handles debouncing for file sync operations"""
-
-    def __init__(self, delay: float = config.DEBOUNCE_DELAY):
+    """Collects event keys and hands them to a callback in batches
+
+    The first key after a quiet period is flushed at once. Keys arriving
+    within ``delay`` of a flush are collected into one deduplicated batch,
+    flushed ``delay`` after the latest key but never later than
+    ``max_delay`` after the first one.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[set[str]], None],
+        delay: float = config.DEBOUNCE_DELAY,
+        max_delay: float = config.MAX_DEBOUNCE_DELAY,
+    ):
+        self.callback = callback
         self.delay = delay
-        self.last_sync_time = 0.0
-        self.syncing = False
-
-    def should_debounce(self) -> bool:
-        """Check if we should debounce this sync operation"""
-        if self.syncing:
-            return True
-
-        current_time = time.time()
-        time_since_last = current_time - self.last_sync_time
-        return time_since_last < self.delay
+        self.max_delay = max_delay
+        self._pending: set[str] = set()
+        self._timer: Optional[threading.Timer] = None
+        # Last timer that handed out a batch, joined by flush()
+        self._fired: Optional[threading.Thread] = None
+        self._first_pending = 0.0
+        self._last_flush: Optional[float] = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        # Clock used for all timing decisions; tests may swap it
+        self._now: Callable[[], float] = time.monotonic
+
+    def submit(self, key: str) -> None:
+        """Flush key now or add it to the pending batch"""
+        now = self._now()
+        batch = None
+        with self._lock:
+            if self._timer is None and (
+                self._last_flush is None
+                or now - self._last_flush >= self.delay
+            ):
+                self._last_flush = now
+                batch = {key}
+            else:
+                if self._timer is None:
+                    self._first_pending = now
+                else:
+                    self._timer.cancel()
+                    self._timer = None
+                self._pending.add(key)
+
+                wait = min(
+                    self.delay, self._first_pending + self.max_delay - now
+                )
+                if wait > 0:
+                    self._timer = threading.Timer(wait, self._fire)
+                    self._timer.daemon = True
+                    self._timer.start()
+                else:
+                    # max_delay has passed; flush here, not via a timer
+                    batch, self._pending = self._pending, set()
+                    self._last_flush = now
+
+        if batch is not None:
+            self._run(batch)
+
+    def flush(self) -> None:
+        """Hand the pending batch to the callback now and wait for it"""
+        batch = None
+        with self._lock:
+            fired, self._fired = self._fired, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+                batch, self._pending = self._pending, set()
+                self._last_flush = self._now()
+
+        # A batch the timer already took may still be in the callback
+        if fired is not None:
+            fired.join()
+        if batch is not None:
+            self._run(batch)
+
+    def cancel(self) -> None:
+        """Drop the pending batch"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+
+    def _fire(self) -> None:
+        """Flush the pending batch unless the timer was superseded"""
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return
+            batch, self._pending = self._pending, set()
+            self._timer = None
+            self._fired = threading.current_thread()
+            self._last_flush = self._now()
 
-    def start_sync(self) -> None:
-        """Mark sync as started"""
-        self.syncing = True
+        self._run(batch)
 
-    def finish_sync(self) -> None:
-        """Mark sync as finished and update timestamp"""
-        self.syncing = False
-        self.last_sync_time = time.time()
+    def _run(self, batch: set[str]) -> None:
+        """Run callbacks one batch at a time"""
+        with self._run_lock:
+            self.callback(batch)
 
 
 class FileMatcher:
@@ -47,28 +135,36 @@ class FileMatcher:
 
     def __init__(self, config: MemoryProxyConfig):
         self.config = config
+        self._dir_prefix = os.path.join(os.fspath(config.directory), "")
+        # Source basename -> mappings, so unrelated files need one lookup
+        self._by_name: dict[str, list[ResolvedMapping]] = {}
+        for mapping in config.resolved_mappings:
+            self._by_name.setdefault(
+                os.path.basename(mapping.source_str), []
+            ).append(mapping)
 
     def find_sync_targets(
-        self, modified_file: Path
+        self, modified_file: Path, modified_file_str: Optional[str] = None
     ) -> list[tuple[Path, Path]]:
         """Find all sync targets for a modified file"""
-        targets = []
+        if modified_file_str is None:
+            modified_file_str = os.fspath(modified_file)
 
-        for target, source in self.config.mappings.items():
-            source_path = self.config.directory / source
+        candidates = self._by_name.get(os.path.basename(modified_file_str))
+        if not candidates:
+            return []
 
+        targets = []
+        for mapping in candidates:
             # Check for direct match
-            if modified_file == source_path:
-                target_path = self.config.directory / target
-                targets.append((modified_file, target_path))
+            if modified_file_str == mapping.source_str:
+                targets.append((modified_file, mapping.target_path))
 
             # Check for recursive match
-            elif (
-                self.config.recursive
-                and modified_file.name == source_path.name
-                and modified_file.is_relative_to(self.config.directory)
+            elif self.config.recursive and modified_file_str.startswith(
+                self._dir_prefix
             ):
-                target_path = modified_file.parent / target
+                target_path = modified_file.parent / mapping.target
                 targets.append((modified_file, target_path))
 
         return targets
@@ -77,66 +173,150 @@ class FileMatcher:
 class MemorySyncHandler(FileSystemEventHandler):
     """Handles file system events and syncs memory files"""
 
-    def __init__(self, config: MemoryProxyConfig):
+    # Only these events reach the handler; watchdog drops the rest
+    # (directory, open/close, move) before they are queued
+    EVENT_TYPES: list[type[FileSystemEvent]] = [
+        FileCreatedEvent,
+        FileDeletedEvent,
+        FileModifiedEvent,
+    ]
+
+    def __init__(
+        self,
+        config: MemoryProxyConfig,
+        gitignore_manager: Optional[GitignoreManager] = None,
+    ):
         self.config = config
-        self.debouncer = SyncDebouncer()
+        self.debouncer = SyncDebouncer(self._sync_batch)
+        self._dir_prefix = os.path.join(os.fspath(config.directory), "")
         self.file_matcher = FileMatcher(config)
 
         # Track which files are targets (generated files)
-        self.target_files: set[Path] = set()
-        for target, _source in self.config.mappings.items():
-            self.target_files.add(self.config.directory / target)
+        self.target_files: set[Path] = {
+            mapping.target_path for mapping in self.config.resolved_mappings
+        }
+        # Events for our own writes are dropped by string lookup; a path
+        # that is also a source is never treated as a target
+        self._target_file_strs: frozenset[str] = frozenset(
+            mapping.target_str for mapping in self.config.resolved_mappings
+        ) - {mapping.source_str for mapping in self.config.resolved_mappings}
+
+        # Source path string -> config-level targets, so direct matches are
+        # resolved with a single dict lookup instead of Path comparisons
+        self._source_to_targets: dict[str, list[Path]] = {}
+        for mapping in self.config.resolved_mappings:
+            self._source_to_targets.setdefault(mapping.source_str, []).append(
+                mapping.target_path
+            )
+        # Only files with a source basename can ever trigger a sync
+        self._source_basenames: frozenset[str] = frozenset(
+            os.path.basename(mapping.source_str)
+            for mapping in self.config.resolved_mappings
+        )
 
-        # Initialize gitignore manager if enabled
+        # Initialize gitignore manager if enabled; a manager already built
+        # for this directory can be shared to avoid parsing rules twice
         self.gitignore_manager: Optional[GitignoreManager] = None
         if self.config.respect_gitignore:
-            self.gitignore_manager = GitignoreManager(self.config.directory)
+            self.gitignore_manager = gitignore_manager or GitignoreManager(
+                self.config.directory
+            )
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        """Handle file creation events"""
+        if not event.is_directory:
+            self._reload_gitignore_if_changed(os.fsdecode(event.src_path))
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        """Handle file deletion events"""
+        if not event.is_directory:
+            self._reload_gitignore_if_changed(os.fsdecode(event.src_path))
 
     def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification events"""
         if event.is_directory:
             return
 
-        file_path = Path(str(event.src_path))
-        logger.debug(f"File modified: {file_path}")
+        src_path = os.fsdecode(event.src_path)
+        if src_path in self._target_file_strs:
+            return
+
+        if self._reload_gitignore_if_changed(src_path):
+            return
+
+        if src_path.rpartition(os.sep)[2] not in self._source_basenames:
+            return
+
+        if (
+            src_path not in self._source_to_targets
+            and not self.config.recursive
+        ):
+            return
+
+        file_path = Path(src_path)
+        logger.debug("File modified: %s", file_path)
 
         if not self._should_process_file(file_path):
             return
 
-        self._process_file_modification(file_path)
+        self.debouncer.submit(src_path)
+
+    def _sync_batch(self, src_paths: set[str]) -> None:
+        """Sync every unique source path collected by the debouncer"""
+        for src_path in src_paths:
+            self._process_file_modification(
+                Path(src_path), self._source_to_targets.get(src_path), src_path
+            )
+
+    def _reload_gitignore_if_changed(self, src_path: str) -> bool:
+        """Reload gitignore rules if the event path is a .gitignore file"""
+        if not (
+            self.gitignore_manager and src_path.endswith(f"{os.sep}.gitignore")
+        ):
+            return False
+
+        if self.gitignore_manager.reload_gitignore(src_path):
+            logger.debug("Reloaded gitignore rules from %s", src_path)
+        return True
 
     def _should_process_file(self, file_path: Path) -> bool:
         """Check if file should be processed for syncing"""
+        # Same always-ignored directories as the initial recursive search
+        path_str = os.fspath(file_path)
+        if path_str.startswith(self._dir_prefix) and not (
+            config.ALWAYS_IGNORED_DIRS.isdisjoint(
+                path_str[len(self._dir_prefix) :].split(os.sep)[:-1]
+            )
+        ):
+            logger.debug("Skipping file in ignored directory: %s", file_path)
+            return False
+
         # Skip ignored files
         if self.gitignore_manager and self.gitignore_manager.is_ignored(
             file_path
         ):
-            logger.debug(f"Skipping ignored file: {file_path}")
-            return False
-
-        # Debounce rapid fire events
-        if self.debouncer.should_debounce():
-            logger.debug(
-                f"Debouncing {file_path} - currently syncing or too recent"
-            )
+            logger.debug("Skipping ignored file: %s", file_path)
             return False
 
         return True
 
-    def _process_file_modification(self, file_path: Path) -> None:
+    def _process_file_modification(
+        self,
+        file_path: Path,
+        targets: Optional[list[Path]] = None,
+        file_path_str: Optional[str] = None,
+    ) -> None:
         """Process a file modification and sync targets"""
-        self.debouncer.start_sync()
-
-        try:
-            sync_targets = self.file_matcher.find_sync_targets(file_path)
+        if targets is None:
+            sync_targets = self.file_matcher.find_sync_targets(
+                file_path, file_path_str
+            )
+        else:
+            sync_targets = [(file_path, target) for target in targets]
 
-            if sync_targets:
-                synced_paths = self._sync_all_targets(sync_targets)
-                self._log_sync_results(file_path, synced_paths)
-                self.debouncer.finish_sync()
-        finally:
-            if self.debouncer.syncing:
-                self.debouncer.syncing = False
+        if sync_targets:
+            synced_paths = self._sync_all_targets(sync_targets)
+            self._log_sync_results(file_path, synced_paths)
 
     def _sync_all_targets(
         self, targets: list[tuple[Path, Path]]
@@ -152,7 +332,7 @@ class MemorySyncHandler(FileSystemEventHandler):
         self, source_file: Path, synced_paths: list[Path]
     ) -> None:
         """Log the results of sync operations"""
-        if not synced_paths:
+        if not synced_paths or not logger.isEnabledFor(logging.INFO):
             return
 
         source_dir, source_name = PathUtils.get_relative_path_info(
@@ -161,42 +341,92 @@ class MemorySyncHandler(FileSystemEventHandler):
         target_names = [path.name for path in synced_paths]
         targets_str = ", ".join(target_names)
 
-        logger.info(f"Synced {source_dir}/{source_name} -> {targets_str}")
+        logger.info("Synced %s/%s -> %s", source_dir, source_name, targets_str)
 
     def sync_file(self, source: Path, target: Path) -> None:
         """Sync content from source to target file"""
+        # No exists() pre-check: a source removed at any point before the
+        # copy finishes surfaces as FileNotFoundError
         try:
-            if not source.exists():
-                logger.warning(f"Source file {source} does not exist")
+            source_stat = source.stat()
+            if self._target_is_current(source, source_stat, target):
+                logger.debug("Target %s is up to date", target)
                 return
 
-            content = FileOperations.read_file(source)
-            FileOperations.write_file(target, content)
+            FileOperations.copy_file(source, target, source_stat)
 
+        except FileNotFoundError:
+            logger.warning("Source file %s does not exist", source)
         except Exception as e:
-            logger.error(f"Failed to sync {source} to {target}: {e}")
+            logger.error("Failed to sync %s to %s: %s", source, target, e)
+
+    def _target_is_current(
+        self, source: Path, source_stat: os.stat_result, target: Path
+    ) -> bool:
+        """Check whether target already holds the source bytes"""
+        try:
+            target_stat = target.stat()
+        except FileNotFoundError:
+            return False
+
+        if source_stat.st_size != target_stat.st_size:
+            return False
+
+        # Synced targets carry the source mtime
+        if source_stat.st_mtime_ns == target_stat.st_mtime_ns:
+            return True
+
+        if not filecmp.cmp(source, target, shallow=False):
+            return False
+
+        # Same bytes, different mtime: restamp so the next check is cheap
+        os.utime(target, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        return True
 
     def initial_sync(self) -> None:
         """Perform initial sync for all mappings"""
         logger.info(f"Performing initial sync for {self.config.directory}")
 
-        for target, source in self.config.mappings.items():
-            self._sync_initial_mapping(target, source)
+        # One directory listing instead of an exists() call per mapping
+        try:
+            with os.scandir(self.config.directory) as entries:
+                existing_names = {entry.name for entry in entries}
+        except OSError as e:
+            logger.debug(f"Error listing {self.config.directory}: {e}")
+            existing_names = set()
+
+        mappings_by_source: dict[str, list[ResolvedMapping]] = {}
+        for mapping in self.config.resolved_mappings:
+            mappings_by_source.setdefault(mapping.source, []).append(mapping)
+
+        for source, mappings in mappings_by_source.items():
+            self._sync_initial_mapping(source, mappings, existing_names)
+
+    def _sync_initial_mapping(
+        self,
+        source: str,
+        mappings: list[ResolvedMapping],
+        existing_names: set[str],
+    ) -> None:
+        """Sync all targets of a single source during initial sync"""
+        source_path = mappings[0].source_path
 
-    def _sync_initial_mapping(self, target: str, source: str) -> None:
-        """Sync a single mapping during initial sync"""
-        source_path = self.config.directory / source
+        if os.path.basename(source) == source:
+            source_exists = source in existing_names
+        else:
+            source_exists = source_path.exists()
 
-        if source_path.exists():
-            # Direct match - create target at config level
-            target_path = self.config.directory / target
-            self.sync_file(source_path, target_path)
+        if source_exists:
+            # Direct match - create targets at config level
+            for mapping in mappings:
+                self.sync_file(source_path, mapping.target_path)
         elif self.config.recursive:
             # In recursive mode, search for source files in subdirectories
             found_source = self._find_source_file_recursive(source)
             if found_source:
-                target_path = found_source.parent / target
-                self.sync_file(found_source, target_path)
+                for mapping in mappings:
+                    target_path = found_source.parent / mapping.target
+                    self.sync_file(found_source, target_path)
             else:
                 logger.warning(
                     f"Source file {source} not found in {self.config.directory} or subdirectories"
@@ -211,26 +441,22 @@ class MemorySyncHandler(FileSystemEventHandler):
     ) -> Optional[Path]:
         """Find a source file with the given name in subdirectories"""
         try:
-            for root, dirs, files in os.walk(self.config.directory):
-                # Filter out ignored directories if gitignore is enabled
-                if self.gitignore_manager:
-                    dirs[:] = [
-                        d
-                        for d in dirs
-                        if not self.gitignore_manager.is_ignored(
-                            Path(root) / d
-                        )
-                    ]
-
-                if source_filename in files:
-                    candidate_path = Path(root) / source_filename
-                    # Skip if the file is ignored
-                    if (
-                        self.gitignore_manager
-                        and self.gitignore_manager.is_ignored(candidate_path)
-                    ):
-                        continue
-                    return candidate_path
+            for dirpath, _dirnames, filenames in PathUtils.iter_tree(
+                self.config.directory,
+                self.gitignore_manager,
+                config.ALWAYS_IGNORED_DIRS,
+            ):
+                if source_filename not in filenames:
+                    continue
+                # Skip if the file is ignored
+                if (
+                    self.gitignore_manager
+                    and self.gitignore_manager.is_ignored_name(
+                        dirpath, source_filename
+                    )
+                ):
+                    continue
+                return Path(dirpath) / source_filename
         except Exception as e:
             logger.debug(f"Error searching for {source_filename}: {e}")
 
@@ -1,12 +1,13 @@
 import os
 import sys
+from collections import deque
 from pathlib import Path
 
 from watchdog.observers import Observer
 
 from config import MemoryProxyConfig
 from constants import config
-from file_ops import PathUtils
+from file_ops import GitignoreManager, PathUtils
 from log import logger
 from sync import MemorySyncHandler
 
@@ -18,10 +19,15 @@ class MemoryProxyWatcher:
         self._observer = Observer()
         self.handlers: dict[Path, MemorySyncHandler] = {}
         self.watched_directories: set[Path] = set()
+        # One manager per root, saved on stop; a handler only gets the one
+        # rooted at its own directory, since it never sees edits to
+        # .gitignore files above it
+        self._gitignore_managers: dict[Path, GitignoreManager] = {}
 
     def start(self) -> bool:
         paths_str = os.environ.get(config.ENV_VAR, "")
-        watch_dirs = PathUtils.resolve_paths(paths_str)
+        # Drop repeated directories while keeping their order
+        watch_dirs = list(dict.fromkeys(PathUtils.resolve_paths(paths_str)))
 
         if not watch_dirs:
             logger.error(
@@ -31,10 +37,15 @@ class MemoryProxyWatcher:
 
         logger.info(f"Scanning directories: {[str(d) for d in watch_dirs]}")
 
-        all_configs = []
-        for directory in watch_dirs:
-            configs = self._scan_for_configs(directory)
-            all_configs.extend(configs)
+        # Overlapping watch directories can discover the same config
+        # twice; keep the first one found
+        all_configs = list(
+            dict.fromkeys(
+                config_path.resolve()
+                for directory in watch_dirs
+                for config_path in self._scan_for_configs(directory)
+            )
+        )
 
         if not all_configs:
             logger.error(
@@ -55,23 +66,71 @@ class MemoryProxyWatcher:
     def stop(self) -> None:
         self._observer.stop()
         self._observer.join()
+        # Sync edits still waiting in the last debounce window
+        for handler in self.handlers.values():
+            handler.debouncer.flush()
+        for gitignore_manager in self._gitignore_managers.values():
+            gitignore_manager.save_cache()
         logger.info("Agent Memory Proxy stopped")
 
     def _scan_for_configs(self, directory: Path) -> list[Path]:
-        """Recursively scan directory for config files"""
-        configs = []
+        """Scan directory breadth-first for config files
 
-        for root, dirs, files in os.walk(directory):
-            root_dir = Path(root)
-
-            if config.CONFIG_FILENAME in files:
-                config_path = root_dir / config.CONFIG_FILENAME
+        A directory holding a config owns its whole subtree, so scanning
+        it stops at the config entry and none of its children are queued.
+        """
+        configs = []
+        gitignore_manager = self._gitignore_manager_for(directory)
+
+        # (absolute path, path relative to the watch root)
+        queue: deque[tuple[str, str]] = deque([(os.fspath(directory), "")])
+        while queue:
+            dirpath, rel_dir = queue.popleft()
+            subdirs: list[str] = []
+            has_config = False
+
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        if entry.name == config.CONFIG_FILENAME:
+                            if entry.is_file():
+                                has_config = True
+                                break
+                            continue
+                        if (
+                            entry.is_dir(follow_symlinks=False)
+                            and entry.name not in config.ALWAYS_IGNORED_DIRS
+                        ):
+                            subdirs.append(entry.name)
+            except OSError as e:
+                logger.debug(f"Error scanning {dirpath}: {e}")
+                continue
+
+            if has_config:
+                config_path = Path(dirpath) / config.CONFIG_FILENAME
                 configs.append(config_path)
-                dirs.clear()
                 logger.info(f"Found config: {config_path}")
+                continue
+
+            for name in subdirs:
+                if not gitignore_manager.is_ignored_dir_name(rel_dir, name):
+                    queue.append(
+                        (
+                            os.path.join(dirpath, name),
+                            f"{rel_dir}/{name}" if rel_dir else name,
+                        )
+                    )
 
         return configs
 
+    def _gitignore_manager_for(self, directory: Path) -> GitignoreManager:
+        """Get the cached-on-disk manager rooted at directory"""
+        if directory not in self._gitignore_managers:
+            self._gitignore_managers[directory] = GitignoreManager(
+                directory, config.CACHE_DIR
+            )
+        return self._gitignore_managers[directory]
+
     def _add_watcher(self, config_path: Path) -> None:
         try:
             config = MemoryProxyConfig(config_path)
@@ -83,14 +142,22 @@ class MemoryProxyWatcher:
                 )
                 return
 
-            handler = MemorySyncHandler(config)
+            handler = MemorySyncHandler(
+                config,
+                self._gitignore_manager_for(watch_path)
+                if config.respect_gitignore
+                else None,
+            )
 
             # Perform initial sync
             handler.initial_sync()
 
             # Watch the directory with recursive setting from config
             self._observer.schedule(
-                handler, str(watch_path), recursive=config.recursive
+                handler,
+                str(watch_path),
+                recursive=config.recursive,
+                event_filter=MemorySyncHandler.EVENT_TYPES,
             )
             self.handlers[config_path] = handler
             self.watched_directories.add(watch_path)
@@ -1,30 +1,56 @@
-import shutil
-import tempfile
-from collections.abc import Generator
+"""
+Shared test helpers and fixtures
+
+Tests keep all files under their own ``tmp_path`` (or ``tmp_path_factory``
+for class-scoped data) and never read or write the working directory or
+the user's cache. That keeps them independent, so they can run in
+parallel, e.g. ``pytest -n auto`` with pytest-xdist installed.
+"""
+
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 
 import pytest
+import yaml
+
+
+class Dumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):
+    """libyaml-backed safe dumper that also writes frozen fixture data"""
+
+
+Dumper.add_representer(
+    MappingProxyType, lambda dumper, data: dumper.represent_dict(data)
+)
+Dumper.add_representer(tuple, lambda dumper, data: dumper.represent_list(data))
+
+
+def write_yaml(path: Path, data: Mapping) -> None:
+    """Write data to path as YAML in a single write"""
+    path.write_text(yaml.dump(data, Dumper=Dumper))
+
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic"""
 
+    def __init__(self):
+        self.now = 0.0
 
-@pytest.fixture
-def temp_dir() -> Generator[Path, None, None]:
-    """Create a temporary directory for testing"""
-    temp_path = Path(tempfile.mkdtemp())
-    yield temp_path
-    shutil.rmtree(temp_path)
+    def __call__(self) -> float:
+        return self.now
 
 
-@pytest.fixture
-def sample_config_data() -> dict:
-    """Sample configuration data for testing"""
-    return {
+@pytest.fixture(scope="session")
+def sample_config_data() -> Mapping:
+    """Sample configuration data for testing, read-only"""
+    return MappingProxyType({
         "respect_gitignore": True,
         "truth_memory_file": "AGENT.md",
-        "agents": ["claude", "gemini", "cursor"]
-    }
+        "agents": ("claude", "gemini", "cursor")
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_agent_content() -> str:
     """Sample content for agent memory files"""
     return """# Agent Memory
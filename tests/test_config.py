@@ -1,41 +1,48 @@
+from collections.abc import Mapping
 from pathlib import Path
 
 import pytest
-import yaml
+from conftest import write_yaml
 
 from config import ConfigValidator, MemoryProxyConfig
+from file_ops import FileOperations
 
 
 class TestConfigValidator:
     """Tests for ConfigValidator focusing on behavior validation"""
 
-    def test_validate_agents_list_with_valid_agents(self):
-        agents = ["claude", "gemini", "cursor"]
+    @pytest.mark.parametrize(
+        "agents",
+        [
+            ["claude", "gemini", "cursor"],
+            ["Claude", "GEMINI", "CuRsOr"],
+        ],
+        ids=["lowercase", "mixed_case"],
+    )
+    def test_validate_agents_list_returns_lowercase_names(self, agents):
         result = ConfigValidator.validate_agents_list(agents)
         assert result == ["claude", "gemini", "cursor"]
 
-    def test_validate_agents_list_converts_to_lowercase(self):
-        agents = ["Claude", "GEMINI", "CuRsOr"]
-        result = ConfigValidator.validate_agents_list(agents)
-        assert result == ["claude", "gemini", "cursor"]
-
-    def test_validate_agents_list_rejects_non_list_input(self):
-        with pytest.raises(ValueError, match="'agents' must be a list"):
-            ConfigValidator.validate_agents_list("claude")
-
-        with pytest.raises(ValueError, match="'agents' must be a list"):
-            ConfigValidator.validate_agents_list({"claude": "CLAUDE.md"})
-
-    def test_validate_agents_list_rejects_non_string_agents(self):
-        with pytest.raises(ValueError, match="Agent name must be string"):
-            ConfigValidator.validate_agents_list([123, "claude"])
-
-        with pytest.raises(ValueError, match="Agent name must be string"):
-            ConfigValidator.validate_agents_list([{"name": "claude"}])
-
-    def test_validate_agents_list_rejects_unknown_agents(self):
-        with pytest.raises(ValueError, match="Unknown agent 'unknown'"):
-            ConfigValidator.validate_agents_list(["claude", "unknown"])
+    @pytest.mark.parametrize(
+        "agents, match",
+        [
+            ("claude", "'agents' must be a list"),
+            ({"claude": "CLAUDE.md"}, "'agents' must be a list"),
+            ([123, "claude"], "Agent name must be string"),
+            ([{"name": "claude"}], "Agent name must be string"),
+            (["claude", "unknown"], "Unknown agent 'unknown'"),
+        ],
+        ids=[
+            "string",
+            "dict",
+            "int_agent",
+            "dict_agent",
+            "unknown_agent",
+        ],
+    )
+    def test_validate_agents_list_rejects_invalid_input(self, agents, match):
+        with pytest.raises(ValueError, match=match):
+            ConfigValidator.validate_agents_list(agents)
 
     def test_create_mappings_generates_correct_mappings(self):
         agents = ["claude", "gemini", "cursor"]
@@ -57,14 +64,23 @@ class TestConfigValidator:
 
         assert mappings == {"CLAUDE.md": "CUSTOM_MEMORY.md"}
 
+    def test_create_mappings_reuses_read_only_result(self):
+        first = ConfigValidator.create_mappings(["claude", "qwen"], "AGENT.md")
+        second = ConfigValidator.create_mappings(("claude", "qwen"), "AGENT.md")
+
+        assert first is second
+        with pytest.raises(TypeError):
+            first["GEMINI.md"] = "AGENT.md"
+
 
 class TestMemoryProxyConfig:
     """Tests for MemoryProxyConfig focusing on configuration loading behavior"""
 
-    def test_load_valid_config(self, temp_dir: Path, sample_config_data: dict):
-        config_path = temp_dir / ".amp.yaml"
-        with open(config_path, 'w') as f:
-            yaml.dump(sample_config_data, f)
+    def test_load_valid_config(
+        self, tmp_path: Path, sample_config_data: Mapping
+    ):
+        config_path = tmp_path / ".amp.yaml"
+        write_yaml(config_path, sample_config_data)
 
         config = MemoryProxyConfig(config_path)
 
@@ -76,11 +92,10 @@ class TestMemoryProxyConfig:
         assert config.mappings["GEMINI.md"] == "AGENT.md"
         assert config.mappings[".cursor/rules/project.mdc"] == "AGENT.md"
 
-    def test_load_config_with_defaults(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
+    def test_load_config_with_defaults(self, tmp_path: Path):
+        config_path = tmp_path / ".amp.yaml"
         minimal_config = {"agents": ["claude"]}
-        with open(config_path, 'w') as f:
-            yaml.dump(minimal_config, f)
+        write_yaml(config_path, minimal_config)
 
         config = MemoryProxyConfig(config_path)
 
@@ -88,15 +103,14 @@ class TestMemoryProxyConfig:
         assert config.truth_memory_file == "AGENT.md"  # default
         assert config.mappings == {"CLAUDE.md": "AGENT.md"}
 
-    def test_load_config_with_custom_values(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
+    def test_load_config_with_custom_values(self, tmp_path: Path):
+        config_path = tmp_path / ".amp.yaml"
         custom_config = {
             "agents": ["gemini"],
             "respect_gitignore": False,
             "truth_memory_file": "PROJECT_RULES.md"
         }
-        with open(config_path, 'w') as f:
-            yaml.dump(custom_config, f)
+        write_yaml(config_path, custom_config)
 
         config = MemoryProxyConfig(config_path)
 
@@ -104,38 +118,81 @@ class TestMemoryProxyConfig:
         assert config.truth_memory_file == "PROJECT_RULES.md"
         assert config.mappings == {"GEMINI.md": "PROJECT_RULES.md"}
 
-    def test_config_missing_agents_section(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
+    def test_config_missing_agents_section(self, tmp_path: Path):
+        config_path = tmp_path / ".amp.yaml"
         invalid_config = {"respect_gitignore": True}
-        with open(config_path, 'w') as f:
-            yaml.dump(invalid_config, f)
+        write_yaml(config_path, invalid_config)
 
         with pytest.raises(ValueError, match="missing 'agents' section"):
             MemoryProxyConfig(config_path)
 
-    def test_config_with_empty_file(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
+    def test_config_with_empty_file(self, tmp_path: Path):
+        config_path = tmp_path / ".amp.yaml"
         config_path.touch()
 
         with pytest.raises(ValueError):
             MemoryProxyConfig(config_path)
 
-    def test_config_with_invalid_yaml(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        with open(config_path, 'w') as f:
-            f.write("invalid: yaml: syntax:")
+    def test_config_with_invalid_yaml(self, tmp_path: Path):
+        config_path = tmp_path / ".amp.yaml"
+        config_path.write_text("invalid: yaml: syntax:")
 
         with pytest.raises(ValueError, match="Invalid YAML"):
             MemoryProxyConfig(config_path)
 
-    def test_directory_property_is_parent_of_config_file(self, temp_dir: Path):
-        sub_dir = temp_dir / "subdir"
+    def test_directory_property_is_parent_of_config_file(self, tmp_path: Path):
+        sub_dir = tmp_path / "subdir"
         sub_dir.mkdir()
         config_path = sub_dir / ".amp.yaml"
-        with open(config_path, 'w') as f:
-            yaml.dump({"agents": ["claude"]}, f)
+        write_yaml(config_path, {"agents": ["claude"]})
 
         config = MemoryProxyConfig(config_path)
 
         assert config.directory == sub_dir
         assert config.config_path == config_path
+
+    def test_unchanged_config_is_parsed_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        config_path = tmp_path / ".amp.yaml"
+        write_yaml(config_path, {"agents": ["claude"]})
+
+        parse_count = 0
+        original_load = FileOperations.load_yaml_config
+        def counting_load(path: Path) -> dict:
+            nonlocal parse_count
+            parse_count += 1
+            return original_load(path)
+        monkeypatch.setattr(
+            FileOperations, "load_yaml_config", staticmethod(counting_load)
+        )
+
+        first = MemoryProxyConfig(config_path)
+        second = MemoryProxyConfig(config_path)
+
+        assert parse_count == 1
+        assert second.mappings == first.mappings == {"CLAUDE.md": "AGENT.md"}
+
+    def test_modified_config_is_reparsed(self, tmp_path: Path):
+        config_path = tmp_path / ".amp.yaml"
+        write_yaml(config_path, {"agents": ["claude"]})
+        MemoryProxyConfig(config_path)
+
+        write_yaml(config_path, {"agents": ["gemini", "qwen"]})
+        config = MemoryProxyConfig(config_path)
+
+        assert config.mappings == {
+            "GEMINI.md": "AGENT.md",
+            "QWEN.md": "AGENT.md"
+        }
+
+    def test_resolved_mappings_use_config_directory(self, tmp_path: Path):
+        config_path = tmp_path / ".amp.yaml"
+        write_yaml(config_path, {"agents": ["cursor"]})
+
+        config = MemoryProxyConfig(config_path)
+
+        [mapping] = config.resolved_mappings
+        assert mapping.source_path == tmp_path / "AGENT.md"
+        assert mapping.target_path == tmp_path / ".cursor/rules/project.mdc"
+        assert mapping.source_str == str(tmp_path / "AGENT.md")
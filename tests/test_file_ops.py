@@ -1,17 +1,24 @@
 import os
 from pathlib import Path
 
+import pathspec
 import pytest
-import yaml
+from conftest import write_yaml
 
 from file_ops import FileOperations, GitignoreManager, PathUtils
 
 
+def bump_mtime(path: Path) -> None:
+    """Move mtime forward so a change is seen despite coarse timestamps"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
 class TestFileOperations:
     """Tests for FileOperations focusing on file I/O behavior"""
 
-    def test_read_file_returns_content(self, temp_dir: Path):
-        test_file = temp_dir / "test.txt"
+    def test_read_file_returns_content(self, tmp_path: Path):
+        test_file = tmp_path / "test.txt"
         expected_content = "Hello, World!\nThis is a test file."
         test_file.write_text(expected_content)
 
@@ -19,8 +26,8 @@ class TestFileOperations:
 
         assert content == expected_content
 
-    def test_read_file_with_custom_encoding(self, temp_dir: Path):
-        test_file = temp_dir / "test.txt"
+    def test_read_file_with_custom_encoding(self, tmp_path: Path):
+        test_file = tmp_path / "test.txt"
         expected_content = "Hello, 世界!"
         test_file.write_text(expected_content, encoding='utf-8')
 
@@ -28,14 +35,14 @@ class TestFileOperations:
 
         assert content == expected_content
 
-    def test_read_file_raises_on_missing_file(self, temp_dir: Path):
-        non_existent = temp_dir / "missing.txt"
+    def test_read_file_raises_on_missing_file(self, tmp_path: Path):
+        non_existent = tmp_path / "missing.txt"
 
         with pytest.raises(Exception):
             FileOperations.read_file(non_existent)
 
-    def test_write_file_creates_file(self, temp_dir: Path):
-        test_file = temp_dir / "new_file.txt"
+    def test_write_file_creates_file(self, tmp_path: Path):
+        test_file = tmp_path / "new_file.txt"
         content = "Test content"
 
         FileOperations.write_file(test_file, content)
@@ -43,8 +50,8 @@ class TestFileOperations:
         assert test_file.exists()
         assert test_file.read_text() == content
 
-    def test_write_file_creates_parent_directories(self, temp_dir: Path):
-        test_file = temp_dir / "sub" / "dir" / "file.txt"
+    def test_write_file_creates_parent_directories(self, tmp_path: Path):
+        test_file = tmp_path / "sub" / "dir" / "file.txt"
         content = "Nested file content"
 
         FileOperations.write_file(test_file, content)
@@ -52,8 +59,8 @@ class TestFileOperations:
         assert test_file.exists()
         assert test_file.read_text() == content
 
-    def test_write_file_overwrites_existing_file(self, temp_dir: Path):
-        test_file = temp_dir / "existing.txt"
+    def test_write_file_overwrites_existing_file(self, tmp_path: Path):
+        test_file = tmp_path / "existing.txt"
         test_file.write_text("Old content")
         new_content = "New content"
 
@@ -61,25 +68,35 @@ class TestFileOperations:
 
         assert test_file.read_text() == new_content
 
-    def test_load_yaml_config_returns_dict(self, temp_dir: Path):
-        config_file = temp_dir / "config.yaml"
+    def test_copy_file_copies_content_and_mtime(self, tmp_path: Path):
+        source = tmp_path / "source.md"
+        source.write_text("Hello, 世界!", encoding='utf-8')
+        os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+        target = tmp_path / "sub" / "dir" / "target.md"
+
+        FileOperations.copy_file(source, target)
+
+        assert target.read_text(encoding='utf-8') == "Hello, 世界!"
+        assert target.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+    def test_load_yaml_config_returns_dict(self, tmp_path: Path):
+        config_file = tmp_path / "config.yaml"
         config_data = {"key": "value", "number": 42, "list": [1, 2, 3]}
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        write_yaml(config_file, config_data)
 
         result = FileOperations.load_yaml_config(config_file)
 
         assert result == config_data
 
-    def test_load_yaml_config_raises_on_invalid_yaml(self, temp_dir: Path):
-        config_file = temp_dir / "bad.yaml"
+    def test_load_yaml_config_raises_on_invalid_yaml(self, tmp_path: Path):
+        config_file = tmp_path / "bad.yaml"
         config_file.write_text("invalid: yaml: syntax:")
 
         with pytest.raises(ValueError, match="Invalid YAML"):
             FileOperations.load_yaml_config(config_file)
 
-    def test_load_yaml_config_raises_on_empty_file(self, temp_dir: Path):
-        config_file = temp_dir / "empty.yaml"
+    def test_load_yaml_config_raises_on_empty_file(self, tmp_path: Path):
+        config_file = tmp_path / "empty.yaml"
         config_file.touch()
 
         with pytest.raises(ValueError, match="Empty or invalid YAML"):
@@ -89,34 +106,34 @@ class TestFileOperations:
 class TestPathUtils:
     """Tests for PathUtils focusing on path manipulation behavior"""
 
-    def test_get_relative_path_info_for_file_in_root(self, temp_dir: Path):
-        file_path = temp_dir / "file.txt"
+    def test_get_relative_path_info_for_file_in_root(self, tmp_path: Path):
+        file_path = tmp_path / "file.txt"
 
-        source_dir, file_name = PathUtils.get_relative_path_info(file_path, temp_dir)
+        source_dir, file_name = PathUtils.get_relative_path_info(file_path, tmp_path)
 
-        assert source_dir == temp_dir.name
+        assert source_dir == tmp_path.name
         assert file_name == "file.txt"
 
-    def test_get_relative_path_info_for_nested_file(self, temp_dir: Path):
-        file_path = temp_dir / "sub" / "dir" / "file.txt"
+    def test_get_relative_path_info_for_nested_file(self, tmp_path: Path):
+        file_path = tmp_path / "sub" / "dir" / "file.txt"
 
-        source_dir, file_name = PathUtils.get_relative_path_info(file_path, temp_dir)
+        source_dir, file_name = PathUtils.get_relative_path_info(file_path, tmp_path)
 
         assert source_dir == "sub/dir"
         assert file_name == "file.txt"
 
-    def test_get_relative_path_info_for_file_outside_base(self, temp_dir: Path):
-        other_dir = temp_dir.parent / "other"
+    def test_get_relative_path_info_for_file_outside_base(self, tmp_path: Path):
+        other_dir = tmp_path.parent / "other"
         file_path = other_dir / "file.txt"
 
-        source_dir, file_name = PathUtils.get_relative_path_info(file_path, temp_dir)
+        source_dir, file_name = PathUtils.get_relative_path_info(file_path, tmp_path)
 
         assert source_dir == str(other_dir)
         assert file_name == "file.txt"
 
-    def test_resolve_paths_returns_valid_directories(self, temp_dir: Path):
-        dir1 = temp_dir / "dir1"
-        dir2 = temp_dir / "dir2"
+    def test_resolve_paths_returns_valid_directories(self, tmp_path: Path):
+        dir1 = tmp_path / "dir1"
+        dir2 = tmp_path / "dir2"
         dir1.mkdir()
         dir2.mkdir()
 
@@ -127,10 +144,10 @@ class TestPathUtils:
         assert dir1 in result
         assert dir2 in result
 
-    def test_resolve_paths_ignores_invalid_paths(self, temp_dir: Path):
-        valid_dir = temp_dir / "valid"
+    def test_resolve_paths_ignores_invalid_paths(self, tmp_path: Path):
+        valid_dir = tmp_path / "valid"
         valid_dir.mkdir()
-        invalid_path = temp_dir / "nonexistent"
+        invalid_path = tmp_path / "nonexistent"
 
         paths_str = f"{valid_dir}{os.pathsep}{invalid_path}"
         result = PathUtils.resolve_paths(paths_str)
@@ -138,9 +155,9 @@ class TestPathUtils:
         assert len(result) == 1
         assert valid_dir in result
 
-    def test_resolve_paths_ignores_files(self, temp_dir: Path):
-        dir_path = temp_dir / "dir"
-        file_path = temp_dir / "file.txt"
+    def test_resolve_paths_ignores_files(self, tmp_path: Path):
+        dir_path = tmp_path / "dir"
+        file_path = tmp_path / "file.txt"
         dir_path.mkdir()
         file_path.touch()
 
@@ -150,49 +167,81 @@ class TestPathUtils:
         assert len(result) == 1
         assert dir_path in result
 
+    def test_iter_tree_skips_pruned_and_ignored_directories(
+        self, tmp_path: Path
+    ):
+        for sub in ("src/pkg", "node_modules/dep", "logs/old"):
+            (tmp_path / sub).mkdir(parents=True)
+        (tmp_path / "src" / "pkg" / "AGENT.md").touch()
+        (tmp_path / ".gitignore").write_text("logs/")
+        manager = GitignoreManager(tmp_path)
+
+        visited = [
+            Path(dirpath).relative_to(tmp_path).as_posix()
+            for dirpath, _dirnames, _filenames in PathUtils.iter_tree(
+                tmp_path, manager, frozenset({"node_modules"})
+            )
+        ]
+
+        assert sorted(visited) == [".", "src", "src/pkg"]
+
+    def test_iter_tree_does_not_descend_into_cleared_dirnames(
+        self, tmp_path: Path
+    ):
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "a" / "b" / "file.txt").touch()
+
+        visited = []
+        for dirpath, dirnames, _filenames in PathUtils.iter_tree(tmp_path):
+            visited.append(Path(dirpath))
+            if Path(dirpath) == tmp_path / "a":
+                dirnames.clear()
+
+        assert visited == [tmp_path, tmp_path / "a"]
+
 
 class TestGitignoreManager:
     """Tests for GitignoreManager focusing on gitignore rule behavior"""
 
-    def test_ignores_files_matching_gitignore_patterns(self, temp_dir: Path):
+    def test_ignores_files_matching_gitignore_patterns(self, tmp_path: Path):
         gitignore_content = "*.log\n__pycache__/\n.env"
-        (temp_dir / ".gitignore").write_text(gitignore_content)
+        (tmp_path / ".gitignore").write_text(gitignore_content)
 
-        manager = GitignoreManager(temp_dir)
+        manager = GitignoreManager(tmp_path)
 
-        assert manager.is_ignored(temp_dir / "test.log")
-        assert manager.is_ignored(temp_dir / "__pycache__" / "module.pyc")
-        assert manager.is_ignored(temp_dir / ".env")
-        assert not manager.is_ignored(temp_dir / "main.py")
+        assert manager.is_ignored(tmp_path / "test.log")
+        assert manager.is_ignored(tmp_path / "__pycache__" / "module.pyc")
+        assert manager.is_ignored(tmp_path / ".env")
+        assert not manager.is_ignored(tmp_path / "main.py")
 
-    def test_respects_nested_gitignore_files(self, temp_dir: Path):
+    def test_respects_nested_gitignore_files(self, tmp_path: Path):
         # Root gitignore
-        (temp_dir / ".gitignore").write_text("*.txt")
+        (tmp_path / ".gitignore").write_text("*.txt")
 
         # Subdirectory gitignore
-        sub_dir = temp_dir / "subdir"
+        sub_dir = tmp_path / "subdir"
         sub_dir.mkdir()
         (sub_dir / ".gitignore").write_text("!important.txt")
 
-        manager = GitignoreManager(temp_dir)
+        manager = GitignoreManager(tmp_path)
 
-        assert manager.is_ignored(temp_dir / "regular.txt")
+        assert manager.is_ignored(tmp_path / "regular.txt")
         # Note: In real gitignore behavior, negation patterns in subdirectories
         # can override parent patterns, but pathspec behavior may vary
 
-    def test_handles_missing_gitignore_gracefully(self, temp_dir: Path):
-        manager = GitignoreManager(temp_dir)
+    def test_handles_missing_gitignore_gracefully(self, tmp_path: Path):
+        manager = GitignoreManager(tmp_path)
 
-        assert not manager.is_ignored(temp_dir / "any_file.txt")
+        assert not manager.is_ignored(tmp_path / "any_file.txt")
 
-    def test_caches_gitignore_specs(self, temp_dir: Path):
-        (temp_dir / ".gitignore").write_text("*.log")
-        manager = GitignoreManager(temp_dir)
+    def test_caches_gitignore_specs(self, tmp_path: Path):
+        (tmp_path / ".gitignore").write_text("*.log")
+        manager = GitignoreManager(tmp_path)
 
         # Create actual files to test with
-        test_file = temp_dir / "test.log"
+        test_file = tmp_path / "test.log"
         test_file.write_text("log content")
-        another_file = temp_dir / "another.log"
+        another_file = tmp_path / "another.log"
         another_file.write_text("more log content")
 
         # First call loads and caches
@@ -210,13 +259,51 @@ class TestGitignoreManager:
         assert manager.is_ignored(test_file)
         assert manager.is_ignored(another_file)
 
-    def test_handles_paths_outside_root(self, temp_dir: Path):
-        manager = GitignoreManager(temp_dir)
-        outside_path = temp_dir.parent / "outside.txt"
+    def test_comment_and_blank_lines_are_not_compiled(self, tmp_path: Path):
+        (tmp_path / ".gitignore").write_bytes(
+            b"# build output\r\n\r\n*.log\r\n   \r\n!keep.log\r\n"
+        )
+
+        manager = GitignoreManager(tmp_path)
+
+        assert manager._own_patterns[tmp_path] == ["*.log", "!keep.log"]
+        assert manager.is_ignored(tmp_path / "debug.log")
+        assert not manager.is_ignored(tmp_path / "keep.log")
+
+    def test_identical_gitignore_files_share_compiled_spec(
+        self, tmp_path: Path
+    ):
+        first, second = tmp_path / "first", tmp_path / "second"
+        for root in (first, second):
+            root.mkdir()
+            (root / ".gitignore").write_text("*.log\nbuild/")
+
+        first_spec = GitignoreManager(first)._load_gitignore_spec(first)
+        second_spec = GitignoreManager(second)._load_gitignore_spec(second)
+
+        assert first_spec is not None
+        assert first_spec is second_spec
+
+    def test_symlinked_root_matches_both_spellings(self, tmp_path: Path):
+        real_root = tmp_path / "real"
+        real_root.mkdir()
+        (real_root / ".gitignore").write_text("*.log")
+        link = tmp_path / "link"
+        link.symlink_to(real_root, target_is_directory=True)
+
+        manager = GitignoreManager(link)
+
+        assert manager.is_ignored(link / "x.log")
+        assert manager.is_ignored(real_root / "x.log")
+        assert not manager.is_ignored(link / "x.py")
+
+    def test_handles_paths_outside_root(self, tmp_path: Path):
+        manager = GitignoreManager(tmp_path)
+        outside_path = tmp_path.parent / "outside.txt"
 
         assert not manager.is_ignored(outside_path)
 
-    def test_handles_complex_gitignore_patterns(self, temp_dir: Path):
+    def test_handles_complex_gitignore_patterns(self, tmp_path: Path):
         gitignore_content = """
 # Comments should be ignored
 *.tmp
@@ -225,12 +312,240 @@ class TestGitignoreManager:
 src/**/*.test.js
 .DS_Store
 """
-        (temp_dir / ".gitignore").write_text(gitignore_content)
+        (tmp_path / ".gitignore").write_text(gitignore_content)
+
+        manager = GitignoreManager(tmp_path)
+
+        assert manager.is_ignored(tmp_path / "file.tmp")
+        assert not manager.is_ignored(tmp_path / "keep.tmp")
+        assert manager.is_ignored(tmp_path / "build" / "output.js")
+        assert manager.is_ignored(tmp_path / "src" / "components" / "Button.test.js")
+        assert manager.is_ignored(tmp_path / ".DS_Store")
+
+    def test_directory_only_patterns_match_directories(self, tmp_path: Path):
+        (tmp_path / ".gitignore").write_text("logs/")
+        (tmp_path / "logs").mkdir()
+
+        manager = GitignoreManager(tmp_path)
+
+        assert manager.is_ignored(tmp_path / "logs", is_dir=True)
+        assert manager.is_ignored_name(str(tmp_path), "logs", is_dir=True)
+        assert not manager.is_ignored(tmp_path / "logs")
+
+    def test_is_ignored_dir_name_matches_without_touching_disk(
+        self, tmp_path: Path
+    ):
+        (tmp_path / ".gitignore").write_text("__pycache__/\n/build/")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / ".gitignore").write_text(".venv/")
+
+        manager = GitignoreManager(tmp_path)
+
+        assert manager.is_ignored_dir_name("", "__pycache__")
+        assert manager.is_ignored_dir_name("pkg/sub", "__pycache__")
+        assert manager.is_ignored_dir_name("", "build")
+        assert not manager.is_ignored_dir_name("pkg", "build")
+        assert manager.is_ignored_dir_name("pkg", ".venv")
+        assert not manager.is_ignored_dir_name("", ".venv")
+
+    def test_nested_gitignore_patterns_are_scoped_to_their_directory(
+        self, tmp_path: Path
+    ):
+        sub_dir = tmp_path / "subdir"
+        sub_dir.mkdir()
+        (sub_dir / ".gitignore").write_text("/build/\n*.log")
+
+        manager = GitignoreManager(tmp_path)
+
+        assert manager.is_ignored(sub_dir / "build" / "output.js")
+        assert manager.is_ignored(sub_dir / "deep" / "debug.log")
+        assert not manager.is_ignored(tmp_path / "build" / "output.js")
+        assert not manager.is_ignored(tmp_path / "debug.log")
+
+    def test_saved_rules_are_reused_while_tree_is_unchanged(
+        self, tmp_path: Path, monkeypatch
+    ):
+        root = tmp_path / "repo"
+        (root / "pkg").mkdir(parents=True)
+        (root / ".gitignore").write_text("*.log")
+        (root / "pkg" / ".gitignore").write_text("*.tmp")
+        cache_dir = tmp_path / "cache"
+
+        GitignoreManager(root, cache_dir).save_cache()
+
+        walks = []
+        monkeypatch.setattr(
+            GitignoreManager,
+            "_collect_gitignore_patterns",
+            lambda self, top=None: walks.append(top),
+        )
+        manager = GitignoreManager(root, cache_dir)
+
+        assert walks == []
+        assert manager.is_ignored(root / "debug.log")
+        assert manager.is_ignored(root / "pkg" / "scratch.tmp")
+        assert not manager.is_ignored(root / "scratch.tmp")
+
+    def test_saved_rules_are_dropped_after_pathspec_upgrade(
+        self, tmp_path: Path, monkeypatch
+    ):
+        root = tmp_path / "repo"
+        root.mkdir()
+        (root / ".gitignore").write_text("*.log")
+        cache_dir = tmp_path / "cache"
+
+        GitignoreManager(root, cache_dir).save_cache()
+        monkeypatch.setattr(pathspec, "__version__", "0.0.0")
+
+        walks = []
+        monkeypatch.setattr(
+            GitignoreManager,
+            "_collect_gitignore_patterns",
+            lambda self, top=None: walks.append(top),
+        )
+        GitignoreManager(root, cache_dir)
+
+        assert len(walks) == 1
+
+    def test_saved_rules_are_dropped_after_gitignore_edit(
+        self, tmp_path: Path
+    ):
+        root = tmp_path / "repo"
+        root.mkdir()
+        gitignore = root / ".gitignore"
+        gitignore.write_text("*.log")
+        cache_dir = tmp_path / "cache"
+
+        GitignoreManager(root, cache_dir).save_cache()
+        gitignore.write_text("*.tmp")
+        bump_mtime(gitignore)
+
+        manager = GitignoreManager(root, cache_dir)
+
+        assert manager.is_ignored(root / "scratch.tmp")
+        assert not manager.is_ignored(root / "debug.log")
+
+    def test_saved_rules_are_patched_for_changed_directories(
+        self, tmp_path: Path, monkeypatch
+    ):
+        root = tmp_path / "repo"
+        (root / "old").mkdir(parents=True)
+        (root / ".gitignore").write_text("*.log")
+        (root / "old" / ".gitignore").write_text("*.bak")
+        cache_dir = tmp_path / "cache"
+
+        GitignoreManager(root, cache_dir).save_cache()
+        (root / "CLAUDE.md").write_text("Generated")
+        (root / "old" / ".gitignore").unlink()
+        (root / "old").rmdir()
+        (root / "pkg").mkdir()
+        (root / "pkg" / ".gitignore").write_text("*.tmp")
+        bump_mtime(root)
+
+        walked = []
+        collect = GitignoreManager._collect_gitignore_patterns
+        monkeypatch.setattr(
+            GitignoreManager,
+            "_collect_gitignore_patterns",
+            lambda self, top=None: walked.append(top) or collect(self, top),
+        )
+        manager = GitignoreManager(root, cache_dir)
+
+        assert walked == [str(root / "pkg"), str(root / "old")]
+        assert manager.is_ignored(root / "debug.log")
+        assert manager.is_ignored(root / "pkg" / "scratch.tmp")
+        assert not manager.is_ignored(root / "old" / "notes.bak")
+
+    def test_reload_gitignore_rewalks_only_that_subtree(
+        self, tmp_path: Path, monkeypatch
+    ):
+        (tmp_path / ".gitignore").write_text("*.log")
+        sub_dir = tmp_path / "sub"
+        sub_dir.mkdir()
+        manager = GitignoreManager(tmp_path)
+        assert not manager.is_ignored(sub_dir / "scratch.tmp")
+
+        walked = []
+        collect = GitignoreManager._collect_gitignore_patterns
+        monkeypatch.setattr(
+            GitignoreManager,
+            "_collect_gitignore_patterns",
+            lambda self, top=None: walked.append(top) or collect(self, top),
+        )
+        (sub_dir / ".gitignore").write_text("*.tmp")
+
+        assert manager.reload_gitignore(str(sub_dir / ".gitignore"))
+        assert walked == [str(sub_dir)]
+        assert manager.is_ignored(sub_dir / "scratch.tmp")
+        assert manager.is_ignored(sub_dir / "debug.log")
+        assert not manager.is_ignored(tmp_path / "scratch.tmp")
+
+        (sub_dir / ".gitignore").unlink()
+
+        assert manager.reload_gitignore(str(sub_dir / ".gitignore"))
+        assert not manager.is_ignored(sub_dir / "scratch.tmp")
+
+    @pytest.mark.parametrize(
+        "sub", ["node_modules/a", ".pytest_cache", "logs/old"]
+    )
+    def test_reload_gitignore_skips_pruned_and_ignored_directories(
+        self, tmp_path: Path, sub: str
+    ):
+        (tmp_path / ".gitignore").write_text(".pytest_cache/\nlogs/")
+        (tmp_path / sub).mkdir(parents=True)
+        (tmp_path / sub / ".gitignore").write_text("*")
+        manager = GitignoreManager(tmp_path)
+
+        assert not manager.reload_gitignore(str(tmp_path / sub / ".gitignore"))
+        assert not manager.is_ignored(tmp_path / "main.py")
+
+    def test_reload_gitignore_picks_up_new_root_file(self, tmp_path: Path):
+        manager = GitignoreManager(tmp_path)
+        log_file = tmp_path / "debug.log"
+        assert not manager.is_ignored(log_file)
+
+        (tmp_path / ".gitignore").write_text("*.log")
+
+        assert manager.reload_gitignore(str(tmp_path / ".gitignore"))
+        assert manager.is_ignored(log_file)
+
+    def test_reload_gitignore_applies_edits_under_build(self, tmp_path: Path):
+        build_dir = tmp_path / "build"
+        build_dir.mkdir()
+        (build_dir / ".gitignore").write_text("*.log")
+        manager = GitignoreManager(tmp_path)
+        assert manager.is_ignored(build_dir / "debug.log")
+
+        (build_dir / ".gitignore").write_text("*.tmp")
+
+        assert manager.reload_gitignore(str(build_dir / ".gitignore"))
+        assert manager.is_ignored(build_dir / "scratch.tmp")
+        assert not manager.is_ignored(build_dir / "debug.log")
+
+    def test_reload_gitignore_reads_rules_of_unignored_subtree(
+        self, tmp_path: Path
+    ):
+        (tmp_path / ".gitignore").write_text("gen/")
+        nested = tmp_path / "gen" / "sub"
+        nested.mkdir(parents=True)
+        (nested / ".gitignore").write_text("*.tmp")
+        manager = GitignoreManager(tmp_path)
+        assert manager.is_ignored(nested / "AGENT.md")
+
+        (tmp_path / ".gitignore").write_text("other/")
+
+        assert manager.reload_gitignore(str(tmp_path / ".gitignore"))
+        assert not manager.is_ignored(nested / "AGENT.md")
+        assert manager.is_ignored(nested / "scratch.tmp")
+
+    def test_nested_negation_overrides_parent_rules(self, tmp_path: Path):
+        (tmp_path / ".gitignore").write_text("*.txt")
+        sub_dir = tmp_path / "subdir"
+        sub_dir.mkdir()
+        (sub_dir / ".gitignore").write_text("!important.txt")
 
-        manager = GitignoreManager(temp_dir)
+        manager = GitignoreManager(tmp_path)
 
-        assert manager.is_ignored(temp_dir / "file.tmp")
-        assert not manager.is_ignored(temp_dir / "keep.tmp")
-        assert manager.is_ignored(temp_dir / "build" / "output.js")
-        assert manager.is_ignored(temp_dir / "src" / "components" / "Button.test.js")
-        assert manager.is_ignored(temp_dir / ".DS_Store")
+        assert not manager.is_ignored(sub_dir / "important.txt")
+        assert manager.is_ignored(sub_dir / "notes.txt")
+        assert manager.is_ignored(tmp_path / "important.txt")
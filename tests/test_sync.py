@@ -1,179 +1,226 @@
-import time
+import os
+import threading
 from pathlib import Path
-from unittest.mock import Mock
+from types import SimpleNamespace
 
-import yaml
+import pytest
+from conftest import FakeClock, write_yaml
 
 from config import MemoryProxyConfig
+from file_ops import FileOperations, GitignoreManager
 from sync import FileMatcher, MemorySyncHandler, SyncDebouncer
 
 
-class TestSyncDebouncer:
-    """Tests for SyncDebouncer focusing on debouncing behavior"""
+def fs_event(src: Path, is_dir: bool = False) -> SimpleNamespace:
+    """Minimal stand-in for a watchdog event"""
+    return SimpleNamespace(is_directory=is_dir, src_path=str(src))
 
-    def test_should_not_debounce_first_sync(self):
-        debouncer = SyncDebouncer(delay=0.1)
 
-        assert not debouncer.should_debounce()
+def make_config(directory: Path, **config_data) -> MemoryProxyConfig:
+    """Write .amp.yaml into directory and load it"""
+    config_path = directory / ".amp.yaml"
+    write_yaml(config_path, config_data)
+    return MemoryProxyConfig(config_path)
 
-    def test_should_debounce_rapid_syncs(self):
-        debouncer = SyncDebouncer(delay=0.1)
 
-        debouncer.start_sync()
-        debouncer.finish_sync()
+@pytest.fixture
+def claude_config(tmp_path: Path) -> MemoryProxyConfig:
+    """AGENT.md synced to CLAUDE.md"""
+    return make_config(tmp_path, agents=["claude"])
 
-        # Immediately after sync, should debounce
-        assert debouncer.should_debounce()
 
-    def test_should_not_debounce_after_delay(self):
-        debouncer = SyncDebouncer(delay=0.05)
+@pytest.fixture
+def two_agent_config(tmp_path: Path) -> MemoryProxyConfig:
+    """AGENT.md synced to CLAUDE.md and GEMINI.md"""
+    return make_config(tmp_path, agents=["claude", "gemini"])
 
-        debouncer.start_sync()
-        debouncer.finish_sync()
 
-        time.sleep(0.06)  # Wait longer than delay
+@pytest.fixture
+def cursor_config(tmp_path: Path) -> MemoryProxyConfig:
+    """AGENT.md synced to the nested cursor rules file"""
+    return make_config(tmp_path, agents=["cursor"])
 
-        assert not debouncer.should_debounce()
 
-    def test_should_debounce_when_syncing_in_progress(self):
-        debouncer = SyncDebouncer(delay=0.1)
+@pytest.fixture(scope="class")
+def matchers(tmp_path_factory: pytest.TempPathFactory) -> dict[str, FileMatcher]:
+    """One matcher per config shape, each in its own directory"""
+    configs = {
+        "single": {"agents": ["claude"]},
+        "three": {"agents": ["claude", "gemini", "cursor"]},
+        "custom": {
+            "agents": ["claude"],
+            "truth_memory_file": "CUSTOM_MEMORY.md",
+        },
+        "recursive": {"agents": ["claude"]},
+    }
+    matchers = {}
+    for name, config_data in configs.items():
+        config = make_config(tmp_path_factory.mktemp(name), **config_data)
+        config.recursive = name == "recursive"
+        matchers[name] = FileMatcher(config)
+    return matchers
 
-        debouncer.start_sync()
 
-        assert debouncer.should_debounce()
+class TestSyncDebouncer:
+    """Tests for SyncDebouncer focusing on debouncing behavior"""
 
-        debouncer.finish_sync()
+    def test_submit_flushes_first_key_immediately(self):
+        batches = []
+        debouncer = SyncDebouncer(batches.append, delay=0.1)
 
-        # After finishing, should still debounce due to timing
-        assert debouncer.should_debounce()
+        debouncer.submit("AGENT.md")
 
-    def test_sync_state_transitions(self):
-        debouncer = SyncDebouncer()
+        assert batches == [{"AGENT.md"}]
 
-        assert not debouncer.syncing
+    def test_submit_batches_and_deduplicates_rapid_keys(self):
+        batches = []
+        debouncer = SyncDebouncer(batches.append, delay=0.05)
+        debouncer._now = FakeClock()
 
-        debouncer.start_sync()
-        assert debouncer.syncing
+        for key in ("a/AGENT.md", "a/AGENT.md", "b/AGENT.md", "a/AGENT.md"):
+            debouncer.submit(key)
 
-        debouncer.finish_sync()
-        assert not debouncer.syncing
+        assert batches == [{"a/AGENT.md"}]
 
+        debouncer.flush()
 
-class TestFileMatcher:
-    """Tests for FileMatcher focusing on file matching behavior"""
+        assert batches == [{"a/AGENT.md"}, {"a/AGENT.md", "b/AGENT.md"}]
 
-    def test_find_direct_match(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {
-            "agents": ["claude"],
-            "truth_memory_file": "AGENT.md"
-        }
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+    def test_timer_flushes_pending_batch(self):
+        batches = []
+        debouncer = SyncDebouncer(batches.append, delay=0.01)
+        debouncer._now = FakeClock()
 
-        config = MemoryProxyConfig(config_path)
-        matcher = FileMatcher(config)
+        debouncer.submit("a/AGENT.md")
+        debouncer.submit("b/AGENT.md")
+        timer = debouncer._timer
+        assert timer is not None
+        timer.join()
 
-        source_file = temp_dir / "AGENT.md"
-        targets = matcher.find_sync_targets(source_file)
+        assert batches == [{"a/AGENT.md"}, {"b/AGENT.md"}]
 
-        assert len(targets) == 1
-        assert targets[0] == (source_file, temp_dir / "CLAUDE.md")
+    def test_submit_after_quiet_period_flushes_immediately(self):
+        batches = []
+        clock = FakeClock()
+        debouncer = SyncDebouncer(batches.append, delay=0.05)
+        debouncer._now = clock
 
-    def test_find_multiple_targets(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {
-            "agents": ["claude", "gemini", "cursor"],
-            "truth_memory_file": "AGENT.md"
-        }
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+        debouncer.submit("AGENT.md")
+        clock.now += 0.06
+        debouncer.submit("AGENT.md")
 
-        config = MemoryProxyConfig(config_path)
-        matcher = FileMatcher(config)
+        assert batches == [{"AGENT.md"}, {"AGENT.md"}]
 
-        source_file = temp_dir / "AGENT.md"
-        targets = matcher.find_sync_targets(source_file)
+    def test_max_delay_flushes_continuous_bursts(self):
+        batches = []
+        clock = FakeClock()
+        debouncer = SyncDebouncer(batches.append, delay=1.0, max_delay=2.0)
+        debouncer._now = clock
 
-        assert len(targets) == 3
-        target_paths = [t[1] for t in targets]
-        assert temp_dir / "CLAUDE.md" in target_paths
-        assert temp_dir / "GEMINI.md" in target_paths
-        assert temp_dir / ".cursor/rules/project.mdc" in target_paths
+        for _ in range(20):
+            debouncer.submit("AGENT.md")
+            clock.now += 0.25
+        debouncer.cancel()
 
-    def test_find_recursive_match(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {
-            "agents": ["claude"],
-            "truth_memory_file": "AGENT.md"
-        }
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+        # Events never pause for a second, yet max_delay forces flushes
+        assert len(batches) == 3
 
-        config = MemoryProxyConfig(config_path)
-        config.recursive = True
-        matcher = FileMatcher(config)
+    def test_cancel_drops_pending_batch(self):
+        batches = []
+        debouncer = SyncDebouncer(batches.append, delay=0.05)
+        debouncer._now = FakeClock()
 
-        # File in subdirectory with same name
-        sub_dir = temp_dir / "subdir"
-        sub_dir.mkdir()
-        source_file = sub_dir / "AGENT.md"
+        debouncer.submit("a/AGENT.md")
+        debouncer.submit("b/AGENT.md")
+        debouncer.cancel()
+        debouncer.flush()
 
-        targets = matcher.find_sync_targets(source_file)
+        assert batches == [{"a/AGENT.md"}]
 
-        assert len(targets) == 1
-        assert targets[0] == (source_file, sub_dir / "CLAUDE.md")
+    def test_flush_waits_for_batch_taken_by_timer(self):
+        started = threading.Event()
+        release = threading.Event()
+        batches = []
 
-    def test_no_match_for_unrelated_file(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {
-            "agents": ["claude"],
-            "truth_memory_file": "AGENT.md"
-        }
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+        def slow_callback(batch: set[str]) -> None:
+            batches.append(batch)
+            if len(batches) == 2:
+                started.set()
+                release.wait(5)
 
-        config = MemoryProxyConfig(config_path)
-        matcher = FileMatcher(config)
+        debouncer = SyncDebouncer(slow_callback, delay=0.01)
+        debouncer._now = FakeClock()
+        debouncer.submit("a/AGENT.md")
+        debouncer.submit("b/AGENT.md")
+        assert started.wait(5)
 
-        unrelated_file = temp_dir / "README.md"
-        targets = matcher.find_sync_targets(unrelated_file)
+        flusher = threading.Thread(target=debouncer.flush)
+        flusher.start()
+        flusher.join(0.05)
+        assert flusher.is_alive()
 
-        assert len(targets) == 0
+        release.set()
+        flusher.join(5)
+        assert not flusher.is_alive()
 
-    def test_custom_truth_file_matching(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {
-            "agents": ["claude"],
-            "truth_memory_file": "CUSTOM_MEMORY.md"
-        }
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
 
-        config = MemoryProxyConfig(config_path)
-        matcher = FileMatcher(config)
+class TestFileMatcher:
+    """Tests for FileMatcher focusing on file matching behavior"""
+
+    @pytest.mark.parametrize(
+        "name, source, expected",
+        [
+            ("single", "AGENT.md", ["CLAUDE.md"]),
+            (
+                "three",
+                "AGENT.md",
+                ["CLAUDE.md", "GEMINI.md", ".cursor/rules/project.mdc"],
+            ),
+            ("recursive", "subdir/AGENT.md", ["subdir/CLAUDE.md"]),
+            ("single", "subdir/AGENT.md", []),
+            ("single", "README.md", []),
+            ("custom", "CUSTOM_MEMORY.md", ["CLAUDE.md"]),
+        ],
+        ids=[
+            "direct_match",
+            "multiple_targets",
+            "recursive_match",
+            "nested_match_when_not_recursive",
+            "unrelated_file",
+            "custom_truth_file",
+        ],
+    )
+    def test_find_sync_targets(
+        self,
+        matchers: dict[str, FileMatcher],
+        name: str,
+        source: str,
+        expected: list[str],
+    ):
+        matcher = matchers[name]
+        directory = matcher.config.directory
+        source_file = directory / source
 
-        source_file = temp_dir / "CUSTOM_MEMORY.md"
         targets = matcher.find_sync_targets(source_file)
 
-        assert len(targets) == 1
-        assert targets[0] == (source_file, temp_dir / "CLAUDE.md")
+        assert sorted(targets) == sorted(
+            (source_file, directory / target) for target in expected
+        )
+        assert matcher.find_sync_targets(source_file, str(source_file)) == (
+            targets
+        )
 
 
 class TestMemorySyncHandler:
     """Tests for MemorySyncHandler focusing on sync behavior"""
 
-    def test_sync_file_copies_content(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {"agents": ["claude"]}
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+    def test_sync_file_copies_content(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(claude_config)
 
-        config = MemoryProxyConfig(config_path)
-        handler = MemorySyncHandler(config)
-
-        source = temp_dir / "source.txt"
-        target = temp_dir / "target.txt"
+        source = tmp_path / "source.txt"
+        target = tmp_path / "target.txt"
         content = "Test content for sync"
         source.write_text(content)
 
@@ -182,17 +229,13 @@ class TestMemorySyncHandler:
         assert target.exists()
         assert target.read_text() == content
 
-    def test_sync_file_creates_parent_directories(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {"agents": ["cursor"]}
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+    def test_sync_file_creates_parent_directories(
+        self, tmp_path: Path, cursor_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(cursor_config)
 
-        config = MemoryProxyConfig(config_path)
-        handler = MemorySyncHandler(config)
-
-        source = temp_dir / "AGENT.md"
-        target = temp_dir / ".cursor/rules/project.mdc"
+        source = tmp_path / "AGENT.md"
+        target = tmp_path / ".cursor/rules/project.mdc"
         content = "Cursor rules"
         source.write_text(content)
 
@@ -201,64 +244,125 @@ class TestMemorySyncHandler:
         assert target.exists()
         assert target.read_text() == content
 
-    def test_sync_file_handles_missing_source(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {"agents": ["claude"]}
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
-
-        config = MemoryProxyConfig(config_path)
-        handler = MemorySyncHandler(config)
+    def test_sync_file_handles_missing_source(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(claude_config)
 
-        source = temp_dir / "missing.txt"
-        target = temp_dir / "target.txt"
+        source = tmp_path / "missing.txt"
+        target = tmp_path / "target.txt"
 
         # Should not raise, just log warning
         handler.sync_file(source, target)
 
         assert not target.exists()
 
-    def test_initial_sync_syncs_existing_files(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {
-            "agents": ["claude", "gemini"],
-            "truth_memory_file": "AGENT.md"
-        }
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+    def test_sync_file_handles_source_removed_before_copy(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+        claude_config: MemoryProxyConfig,
+    ):
+        handler = MemorySyncHandler(claude_config)
+
+        source = tmp_path / "AGENT.md"
+        source.write_text("Short-lived")
+        target = tmp_path / "CLAUDE.md"
+
+        def vanished(*args, **kwargs):
+            raise FileNotFoundError(source)
+
+        monkeypatch.setattr("file_ops.shutil.copyfile", vanished)
+
+        handler.sync_file(source, target)
+
+        assert not target.exists()
+        assert "does not exist" in caplog.text
+        assert not [r for r in caplog.records if r.levelname == "ERROR"]
+
+    def test_sync_file_skips_up_to_date_target(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        claude_config: MemoryProxyConfig,
+    ):
+        handler = MemorySyncHandler(claude_config)
+
+        copy_count = 0
+        original_copy = FileOperations.copy_file
+        def counting_copy(*args, **kwargs) -> None:
+            nonlocal copy_count
+            copy_count += 1
+            original_copy(*args, **kwargs)
+        monkeypatch.setattr(
+            FileOperations, "copy_file", staticmethod(counting_copy)
+        )
+
+        source = tmp_path / "AGENT.md"
+        target = tmp_path / "CLAUDE.md"
+        source.write_text("Content")
+
+        handler.sync_file(source, target)
+        handler.sync_file(source, target)
 
+        assert copy_count == 1
+        assert target.read_text() == "Content"
+
+    def test_sync_file_skips_target_with_identical_bytes(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        claude_config: MemoryProxyConfig,
+    ):
+        handler = MemorySyncHandler(claude_config)
+
+        copy_count = 0
+        def counting_copy(*args, **kwargs) -> None:
+            nonlocal copy_count
+            copy_count += 1
+        monkeypatch.setattr(
+            FileOperations, "copy_file", staticmethod(counting_copy)
+        )
+
+        source = tmp_path / "AGENT.md"
+        target = tmp_path / "CLAUDE.md"
+        source.write_text("Same content")
+        target.write_text("Same content")
+        os.utime(target, ns=(1_000_000_000, 1_000_000_000))
+
+        handler.sync_file(source, target)
+
+        assert copy_count == 0
+        assert target.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+    def test_initial_sync_syncs_existing_files(
+        self, tmp_path: Path, two_agent_config: MemoryProxyConfig
+    ):
         # Create source file
         source_content = "Initial memory content"
-        (temp_dir / "AGENT.md").write_text(source_content)
+        (tmp_path / "AGENT.md").write_text(source_content)
 
-        config = MemoryProxyConfig(config_path)
-        handler = MemorySyncHandler(config)
+        handler = MemorySyncHandler(two_agent_config)
 
         handler.initial_sync()
 
-        assert (temp_dir / "CLAUDE.md").exists()
-        assert (temp_dir / "CLAUDE.md").read_text() == source_content
-        assert (temp_dir / "GEMINI.md").exists()
-        assert (temp_dir / "GEMINI.md").read_text() == source_content
-
-    def test_initial_sync_recursive_mode(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {
-            "agents": ["claude"],
-            "truth_memory_file": "AGENT.md"
-        }
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
+        assert (tmp_path / "CLAUDE.md").exists()
+        assert (tmp_path / "CLAUDE.md").read_text() == source_content
+        assert (tmp_path / "GEMINI.md").exists()
+        assert (tmp_path / "GEMINI.md").read_text() == source_content
 
+    def test_initial_sync_recursive_mode(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
         # Create source file in subdirectory
-        sub_dir = temp_dir / "docs"
+        sub_dir = tmp_path / "docs"
         sub_dir.mkdir()
         source_content = "Nested memory content"
         (sub_dir / "AGENT.md").write_text(source_content)
 
-        config = MemoryProxyConfig(config_path)
-        config.recursive = True
-        handler = MemorySyncHandler(config)
+        claude_config.recursive = True
+        handler = MemorySyncHandler(claude_config)
 
         handler.initial_sync()
 
@@ -266,41 +370,31 @@ class TestMemorySyncHandler:
         assert (sub_dir / "CLAUDE.md").exists()
         assert (sub_dir / "CLAUDE.md").read_text() == source_content
 
-    def test_on_modified_triggers_sync(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {"agents": ["claude"]}
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
-
-        config = MemoryProxyConfig(config_path)
-        handler = MemorySyncHandler(config)
+    def test_on_modified_triggers_sync(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(claude_config)
 
         # Create source and target files
-        source = temp_dir / "AGENT.md"
-        target = temp_dir / "CLAUDE.md"
+        source = tmp_path / "AGENT.md"
+        target = tmp_path / "CLAUDE.md"
         source.write_text("Original content")
 
         # Simulate file modification event
-        event = Mock()
-        event.is_directory = False
-        event.src_path = str(source)
+        event = fs_event(source)
 
         handler.on_modified(event)
 
-        # Give time for any async operations
-        time.sleep(0.1)
+        handler.debouncer.flush()
 
         assert target.exists()
         assert target.read_text() == "Original content"
 
-    def test_debouncing_prevents_rapid_syncs(self, temp_dir: Path):
-        config_path = temp_dir / ".amp.yaml"
-        config_data = {"agents": ["claude"]}
-        with open(config_path, 'w') as f:
-            yaml.dump(config_data, f)
-
-        config = MemoryProxyConfig(config_path)
-        handler = MemorySyncHandler(config)
+    def test_debouncing_prevents_rapid_syncs(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(claude_config)
+        handler.debouncer._now = FakeClock()
 
         # Mock the sync_file method to count calls
         sync_count = 0
@@ -311,19 +405,200 @@ class TestMemorySyncHandler:
             return original_sync(*args, **kwargs)
         handler.sync_file = counting_sync
 
-        source = temp_dir / "AGENT.md"
+        source = tmp_path / "AGENT.md"
         source.write_text("Content")
 
         # Simulate rapid file modifications
-        event = Mock()
-        event.is_directory = False
-        event.src_path = str(source)
+        event = fs_event(source)
 
-        handler.on_modified(event)
+        handler.on_modified(event)  # Synced immediately
         handler.on_modified(event)  # Should be debounced
         handler.on_modified(event)  # Should be debounced
 
-        time.sleep(0.1)
+        handler.debouncer.flush()
+
+        # Debounced events are coalesced into a single trailing sync
+        assert sync_count == 2
+
+    def test_on_modified_ignores_unrelated_file_when_not_recursive(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        claude_config.recursive = False
+        handler = MemorySyncHandler(claude_config)
+
+        sub_dir = tmp_path / "subdir"
+        sub_dir.mkdir()
+        source = sub_dir / "AGENT.md"
+        source.write_text("Nested content")
+
+        event = fs_event(source)
+
+        handler.on_modified(event)
+
+        assert not (sub_dir / "CLAUDE.md").exists()
+
+    def test_shared_gitignore_manager_is_reused(self, tmp_path: Path):
+        project = tmp_path / "project"
+        project.mkdir()
+        config_path = project / ".amp.yaml"
+        config_data = {"agents": ["claude"]}
+        write_yaml(config_path, config_data)
+        (tmp_path / ".gitignore").write_text("vendor/")
+
+        manager = GitignoreManager(tmp_path)
+        config = MemoryProxyConfig(config_path)
+        handler = MemorySyncHandler(config, gitignore_manager=manager)
+
+        assert handler.gitignore_manager is manager
+        assert not handler._should_process_file(
+            project / "vendor" / "AGENT.md"
+        )
+
+    def test_on_modified_drops_non_source_basenames_before_matching(
+        self, tmp_path: Path, monkeypatch, claude_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(claude_config)
+
+        checked = []
+        monkeypatch.setattr(handler, "_should_process_file", checked.append)
+
+        event = fs_event(tmp_path / "node_modules" / "pkg" / "index.js")
+
+        handler.on_modified(event)
+
+        assert checked == []
+
+    def test_rapid_events_for_different_sources_are_not_dropped(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(claude_config)
+        handler.debouncer._now = FakeClock()
+
+        sub_dir = tmp_path / "subdir"
+        sub_dir.mkdir()
+        root_source = tmp_path / "AGENT.md"
+        nested_source = sub_dir / "AGENT.md"
+        root_source.write_text("Root content")
+        nested_source.write_text("Nested content")
+
+        for source in (root_source, nested_source):
+            event = fs_event(source)
+            handler.on_modified(event)
+
+        handler.debouncer.flush()
+
+        assert (tmp_path / "CLAUDE.md").read_text() == "Root content"
+        assert (sub_dir / "CLAUDE.md").read_text() == "Nested content"
+
+    def test_initial_sync_recursive_mode_creates_nested_target_dirs(
+        self, tmp_path: Path, cursor_config: MemoryProxyConfig
+    ):
+        sub_dir = tmp_path / "docs"
+        sub_dir.mkdir()
+        (sub_dir / "AGENT.md").write_text("Nested rules")
+
+        handler = MemorySyncHandler(cursor_config)
+
+        handler.initial_sync()
+
+        target = sub_dir / ".cursor/rules/project.mdc"
+        assert target.read_text() == "Nested rules"
+
+    def test_initial_sync_recursive_mode_skips_pruned_directories(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        dep_dir = tmp_path / "node_modules" / "dep"
+        dep_dir.mkdir(parents=True)
+        (dep_dir / "AGENT.md").write_text("Dependency rules")
+
+        handler = MemorySyncHandler(claude_config)
+
+        handler.initial_sync()
+
+        assert not (dep_dir / "CLAUDE.md").exists()
+
+    @pytest.mark.parametrize(
+        "sub, synced",
+        [("build", True), ("node_modules", False)],
+        ids=["build_dir", "always_ignored_dir"],
+    )
+    def test_initial_sync_and_events_agree_without_gitignore(
+        self, tmp_path: Path, sub: str, synced: bool
+    ):
+        config = make_config(
+            tmp_path, agents=["claude"], respect_gitignore=False
+        )
+        source_dir = tmp_path / sub
+        source_dir.mkdir()
+        source = source_dir / "AGENT.md"
+        source.write_text("Nested rules")
+
+        handler = MemorySyncHandler(config)
+        handler.initial_sync()
+
+        assert (source_dir / "CLAUDE.md").exists() is synced
+
+        (source_dir / "CLAUDE.md").unlink(missing_ok=True)
+        handler.on_modified(fs_event(source))
+        handler.debouncer.flush()
+
+        assert (source_dir / "CLAUDE.md").exists() is synced
+
+    def test_gitignore_change_applies_to_later_events(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        handler = MemorySyncHandler(claude_config)
+
+        sub_dir = tmp_path / "vendor"
+        sub_dir.mkdir()
+        source = sub_dir / "AGENT.md"
+        source.write_text("Vendored content")
+        gitignore = tmp_path / ".gitignore"
+        gitignore.write_text("vendor/")
+
+        for path in (gitignore, source):
+            event = fs_event(path)
+            handler.on_modified(event)
+
+        handler.debouncer.flush()
+
+        assert not (sub_dir / "CLAUDE.md").exists()
+
+    def test_gitignore_deletion_applies_to_later_events(
+        self, tmp_path: Path, claude_config: MemoryProxyConfig
+    ):
+        gitignore = tmp_path / ".gitignore"
+        gitignore.write_text("vendor/")
+        sub_dir = tmp_path / "vendor"
+        sub_dir.mkdir()
+        source = sub_dir / "AGENT.md"
+        source.write_text("Vendored content")
+
+        handler = MemorySyncHandler(claude_config)
+
+        gitignore.unlink()
+        deleted_event = fs_event(gitignore)
+        handler.on_deleted(deleted_event)
+
+        modified_event = fs_event(source)
+        handler.on_modified(modified_event)
+
+        handler.debouncer.flush()
+
+        assert (sub_dir / "CLAUDE.md").read_text() == "Vendored content"
+
+    def test_on_modified_ignores_events_for_generated_targets(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        claude_config: MemoryProxyConfig,
+    ):
+        handler = MemorySyncHandler(claude_config)
+        submitted = []
+        monkeypatch.setattr(handler.debouncer, "submit", submitted.append)
+
+        event = fs_event(tmp_path / "CLAUDE.md")
+
+        handler.on_modified(event)
 
-        # Should only sync once due to debouncing
-        assert sync_count == 1
+        assert submitted == []
@@ -0,0 +1,163 @@
+import os
+from pathlib import Path
+
+import pytest
+from conftest import FakeClock, write_yaml
+
+from config import MemoryProxyConfig
+from constants import config
+from sync import MemorySyncHandler
+from watcher import MemoryProxyWatcher
+
+
+@pytest.fixture
+def watcher(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Watcher whose gitignore cache stays under tmp_path"""
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path / "cache")
+    return MemoryProxyWatcher()
+
+
+class TestMemoryProxyWatcher:
+    """Tests for MemoryProxyWatcher focusing on lifecycle behavior"""
+
+    def test_stop_syncs_pending_edits(
+        self, tmp_path: Path, watcher: MemoryProxyWatcher
+    ):
+        config_path = tmp_path / ".amp.yaml"
+        write_yaml(config_path, {"agents": ["claude"]})
+        handler = MemorySyncHandler(MemoryProxyConfig(config_path))
+        handler.debouncer._now = FakeClock()
+        watcher.handlers[config_path] = handler
+
+        source = tmp_path / "AGENT.md"
+        source.write_text("First save")
+        handler.debouncer.submit(str(source))
+        final = "Final save before shutdown"
+        source.write_text(final)
+        handler.debouncer.submit(str(source))
+
+        watcher._observer.start()
+        watcher.stop()
+
+        assert (tmp_path / "CLAUDE.md").read_text() == final
+
+    def test_start_creates_one_handler_per_config_for_overlapping_paths(
+        self,
+        tmp_path: Path,
+        watcher: MemoryProxyWatcher,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        workspace = tmp_path / "workspace"
+        for project in ("alpha", "beta"):
+            (workspace / project).mkdir(parents=True)
+            write_yaml(
+                workspace / project / ".amp.yaml", {"agents": ["claude"]}
+            )
+        paths = [workspace, workspace / "alpha", workspace]
+        monkeypatch.setenv(
+            config.ENV_VAR, os.pathsep.join(str(path) for path in paths)
+        )
+
+        try:
+            assert watcher.start()
+        finally:
+            watcher.stop()
+
+        assert sorted(watcher.handlers) == [
+            (workspace / "alpha" / ".amp.yaml").resolve(),
+            (workspace / "beta" / ".amp.yaml").resolve(),
+        ]
+
+    def test_handler_at_watch_root_shares_scan_gitignore_manager(
+        self,
+        tmp_path: Path,
+        watcher: MemoryProxyWatcher,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        write_yaml(tmp_path / ".amp.yaml", {"agents": ["claude"]})
+        monkeypatch.setenv(config.ENV_VAR, str(tmp_path))
+
+        try:
+            watcher.start()
+        finally:
+            watcher.stop()
+
+        (handler,) = watcher.handlers.values()
+        assert handler.gitignore_manager is watcher._gitignore_managers[
+            tmp_path.resolve()
+        ]
+
+    def test_handler_ignores_gitignore_above_its_directory(
+        self,
+        tmp_path: Path,
+        watcher: MemoryProxyWatcher,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        (tmp_path / ".gitignore").write_text("vendor/")
+        project = tmp_path / "proj"
+        (project / "vendor").mkdir(parents=True)
+        write_yaml(project / ".amp.yaml", {"agents": ["claude"]})
+        monkeypatch.setenv(config.ENV_VAR, str(tmp_path))
+
+        try:
+            watcher.start()
+        finally:
+            watcher.stop()
+
+        # The handler only watches proj/, so rules from the root .gitignore
+        # could never be reloaded and must not apply
+        (handler,) = watcher.handlers.values()
+        assert handler._should_process_file(project / "vendor" / "AGENT.md")
+        # Its own manager is kept with the others so its rules are saved
+        assert handler.gitignore_manager is watcher._gitignore_managers[
+            project.resolve()
+        ]
+
+
+class TestScanForConfigs:
+    """Tests for config discovery under a watch directory"""
+
+    def test_finds_configs_breadth_first(
+        self, tmp_path: Path, watcher: MemoryProxyWatcher
+    ):
+        for project in ("a/deep/project", "b"):
+            (tmp_path / project).mkdir(parents=True)
+            write_yaml(tmp_path / project / ".amp.yaml", {"agents": ["claude"]})
+
+        configs = watcher._scan_for_configs(tmp_path)
+
+        assert configs == [
+            tmp_path / "b" / ".amp.yaml",
+            tmp_path / "a" / "deep" / "project" / ".amp.yaml",
+        ]
+
+    def test_skips_configs_in_pruned_directories(
+        self, tmp_path: Path, watcher: MemoryProxyWatcher
+    ):
+        dep_dir = tmp_path / "node_modules" / "dep"
+        dep_dir.mkdir(parents=True)
+        write_yaml(dep_dir / ".amp.yaml", {"agents": ["claude"]})
+
+        assert watcher._scan_for_configs(tmp_path) == []
+
+    def test_skips_configs_in_gitignored_directories(
+        self, tmp_path: Path, watcher: MemoryProxyWatcher
+    ):
+        (tmp_path / ".gitignore").write_text("vendor/")
+        vendored = tmp_path / "vendor" / "lib"
+        vendored.mkdir(parents=True)
+        write_yaml(vendored / ".amp.yaml", {"agents": ["claude"]})
+
+        assert watcher._scan_for_configs(tmp_path) == []
+
+    def test_does_not_return_configs_nested_below_a_config(
+        self, tmp_path: Path, watcher: MemoryProxyWatcher
+    ):
+        write_yaml(tmp_path / ".amp.yaml", {"agents": ["claude"]})
+        nested = tmp_path / "docs"
+        nested.mkdir()
+        write_yaml(nested / ".amp.yaml", {"agents": ["gemini"]})
+
+        assert watcher._scan_for_configs(tmp_path) == [
+            tmp_path / ".amp.yaml"
+        ]